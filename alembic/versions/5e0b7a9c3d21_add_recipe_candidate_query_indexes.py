@@ -0,0 +1,33 @@
+"""add indexes backing the SQL-side recipe candidate query
+
+Revision ID: 5e0b7a9c3d21
+Revises: c41e8d2b9f17
+Create Date: 2026-10-18 11:03:27.904113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5e0b7a9c3d21'
+down_revision = 'c41e8d2b9f17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # pantry name -> ingredient lookup is case-insensitive
+    op.create_index(
+        'ix_ingredients_lower_name', 'ingredients',
+        [sa.text('lower(name)')], unique=False
+    )
+    # ingredient -> recipes; the PK (recipe_id, ingredient_id) only serves recipe -> ingredients
+    op.create_index(
+        op.f('ix_recipe_ingredients_ingredient_id'), 'recipe_ingredients',
+        ['ingredient_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_recipe_ingredients_ingredient_id'), table_name='recipe_ingredients')
+    op.drop_index('ix_ingredients_lower_name', table_name='ingredients')
@@ -0,0 +1,44 @@
+"""add pantry lookup and recipe filter indexes
+
+Revision ID: 9d4f2c6e8a13
+Revises: 5e0b7a9c3d21
+Create Date: 2026-10-18 12:26:51.337820
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9d4f2c6e8a13'
+down_revision = '5e0b7a9c3d21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 1) drop case-insensitive duplicates left behind by the old check-then-insert
+    op.execute("""
+        DELETE FROM pantry_items p
+         USING pantry_items d
+         WHERE p.user_id = d.user_id
+           AND lower(p.name) = lower(d.name)
+           AND p.id > d.id
+    """)
+    # 2) one pantry entry per (user, lower(name)); its user_id prefix also
+    #    serves the plain "WHERE user_id = ?" pantry listings
+    op.create_index(
+        'uq_pantry_items_user_id_lower_name', 'pantry_items',
+        ['user_id', sa.text('lower(name)')], unique=True
+    )
+    # 3) preference predicates of the rule-mode candidate query
+    op.create_index(
+        'ix_recipes_diet_cooking_method_prep_time', 'recipes',
+        ['diet', 'cooking_method', 'prep_time'], unique=False
+    )
+    op.create_index(op.f('ix_recipes_prep_time'), 'recipes', ['prep_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_recipes_prep_time'), table_name='recipes')
+    op.drop_index('ix_recipes_diet_cooking_method_prep_time', table_name='recipes')
+    op.drop_index('uq_pantry_items_user_id_lower_name', table_name='pantry_items')
@@ -0,0 +1,68 @@
+"""add recipes.updated_at watermark for incremental catalog refresh
+
+Revision ID: c41e8d2b9f17
+Revises: a7f24305f8bf
+Create Date: 2026-10-18 09:12:44.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c41e8d2b9f17'
+down_revision = 'a7f24305f8bf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'recipes',
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        )
+    )
+    op.create_index('ix_recipes_updated_at', 'recipes', ['updated_at'], unique=False)
+
+    # keep updated_at moving on recipe edits and on ingredient link changes
+    op.execute("""
+        CREATE OR REPLACE FUNCTION touch_recipe_updated_at() RETURNS trigger AS $$
+        BEGIN
+          NEW.updated_at := now();
+          RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION touch_parent_recipe() RETURNS trigger AS $$
+        BEGIN
+          IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE recipes SET updated_at = now() WHERE id = OLD.recipe_id;
+          END IF;
+          IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            UPDATE recipes SET updated_at = now() WHERE id = NEW.recipe_id;
+          END IF;
+          RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_recipes_touch BEFORE UPDATE ON recipes
+          FOR EACH ROW EXECUTE FUNCTION touch_recipe_updated_at();
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_recipe_ingredients_touch AFTER INSERT OR UPDATE OR DELETE ON recipe_ingredients
+          FOR EACH ROW EXECUTE FUNCTION touch_parent_recipe();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_recipe_ingredients_touch ON recipe_ingredients")
+    op.execute("DROP TRIGGER IF EXISTS trg_recipes_touch ON recipes")
+    op.execute("DROP FUNCTION IF EXISTS touch_parent_recipe()")
+    op.execute("DROP FUNCTION IF EXISTS touch_recipe_updated_at()")
+    op.drop_index('ix_recipes_updated_at', table_name='recipes')
+    op.drop_column('recipes', 'updated_at')
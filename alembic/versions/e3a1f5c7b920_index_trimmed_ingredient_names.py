@@ -0,0 +1,33 @@
+"""index trimmed ingredient names for the recipe candidate query
+
+Revision ID: e3a1f5c7b920
+Revises: 9d4f2c6e8a13
+Create Date: 2026-10-18 19:12:40.518233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e3a1f5c7b920'
+down_revision = '9d4f2c6e8a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # the candidate query now trims ingredient names like pantry names
+    # (normalize_ingredient), so the lookup index has to match
+    op.drop_index('ix_ingredients_lower_name', table_name='ingredients')
+    op.create_index(
+        'ix_ingredients_normalized_name', 'ingredients',
+        [sa.text("lower(btrim(name, E' \\t\\n\\r\\f\\v'))")], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ingredients_normalized_name', table_name='ingredients')
+    op.create_index(
+        'ix_ingredients_lower_name', 'ingredients',
+        [sa.text('lower(name)')], unique=False
+    )
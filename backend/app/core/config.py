@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
-from typing import List, Union
+from typing import List, Literal, Union
 import logging
 
 # Setup logger
@@ -11,13 +11,97 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Authenticated users are re-read from the DB at most this often;
+    # local User updates invalidate immediately, other workers within the TTL
+    AUTH_USER_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: float = 30.0
+    # bcrypt cost factor; existing hashes are upgraded on the next login
+    BCRYPT_ROUNDS: int = 12
+    # Dedicated bcrypt pool, with a bound on queued work
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    PASSWORD_HASH_WAIT_SECONDS: float = 2.0
 
     DATABASE_URL: str
+    # Defaults to DATABASE_URL with the asyncpg driver
+    ASYNC_DATABASE_URL: str = ""
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    # Requests running more queries than this are logged (N+1 canary)
+    DB_QUERY_WARN_THRESHOLD: int = 10
 
     SPOONACULAR_API_KEY: str = ""
+    SPOONACULAR_BASE_URL: str = "https://api.spoonacular.com"
+    SPOONACULAR_TIMEOUT_SECONDS: float = 10.0
+    SPOONACULAR_MAX_CONNECTIONS: int = 20
+    SPOONACULAR_MAX_CONCURRENCY: int = 5
+    SPOONACULAR_CACHE_SIZE: int = 1024
+    SPOONACULAR_SEARCH_TTL_SECONDS: float = 3600.0
+    SPOONACULAR_DETAILS_TTL_SECONDS: float = 86400.0
     FIREBASE_CREDENTIALS_PATH: str = ""
+    # Turns of chat history fed to the RAG chain
+    CHAT_HISTORY_TURNS: int = 10
+    # Write-behind batching of chat turns to Firestore
+    CHAT_HISTORY_WRITE_BATCH_SIZE: int = 200
+    CHAT_HISTORY_FLUSH_INTERVAL_MS: float = 50.0
+    CHAT_HISTORY_MAX_QUEUE: int = 10000
+    # A failed batch is retried this many times, backing off from the delay
+    # below and doubling it, before its turns are dropped
+    CHAT_HISTORY_WRITE_RETRIES: int = 3
+    CHAT_HISTORY_RETRY_BACKOFF_MS: float = 200.0
+    # Recent session history kept in front of Firestore; shared across
+    # workers when REDIS_URL is set, per process otherwise
+    CHAT_HISTORY_CACHE_SIZE: int = 10000
+    CHAT_HISTORY_CACHE_TTL_SECONDS: float = 1800.0
+    # Without REDIS_URL and with several workers, a worker's copy misses the
+    # turns other workers saved; it is then only trusted for this long
+    CHAT_HISTORY_LOCAL_TTL_SECONDS: float = 5.0
+    # Worker processes, as uvicorn --workers / gunicorn read it
+    WEB_CONCURRENCY: int = 1
+    REDIS_URL: str = ""
 
+    # Directory of memory-mapped recipe embedding matrices (see RecipeEmbeddingIndex)
+    RECIPE_EMBEDDINGS_PATH: str = "./recipe_embeddings"
+    RECIPE_CATALOG_REFRESH_SECONDS: float = 30.0
+    CHROMA_PERSIST_DIR: str = "./chroma_db"
+    VECTOR_SYNC_BATCH_SIZE: int = 64
+    # "local" embeds RAG documents/queries with the in-process SentenceTransformer
+    RAG_EMBEDDING_PROVIDER: Literal["mistral", "local"] = "mistral"
+    # Point at a local stub to benchmark the remote provider offline
+    MISTRAL_EMBED_ENDPOINT: str = "https://api.mistral.ai/v1/"
+    # On-disk document embedding cache keyed by text hash; empty disables it
+    EMBEDDING_CACHE_DIR: str = "./embedding_cache"
+    # Semantic cache of RAG answers; a hit needs the same retrieved recipes
+    # and a query embedding at least this cosine-similar
+    RAG_ANSWER_CACHE_SIZE: int = 512
+    RAG_ANSWER_CACHE_TTL_SECONDS: float = 3600.0
+    RAG_ANSWER_CACHE_THRESHOLD: float = 0.92
+    # Standalone rewrites of follow-up queries, per session and recent turns
+    RAG_REFORMULATION_CACHE_SIZE: int = 1024
+    RAG_REFORMULATION_CACHE_TTL_SECONDS: float = 1800.0
+    # User/bot exchanges the rewrite (and its cache key) looks back over
+    RAG_REFORMULATION_HISTORY_TURNS: int = 3
+    # spaCy/SBERT worker pool and encode micro-batching
+    INFERENCE_WORKERS: int = 2
+    INFERENCE_BATCH_WINDOW_MS: float = 5.0
+    INFERENCE_MAX_BATCH_SIZE: int = 32
+    # Filter rule-mode candidates in PostgreSQL instead of the in-memory catalog
+    RULE_FILTER_IN_DB: bool = False
+
+    # False serves only users/pantry/settings: no chat routes, no model
+    # warm-up and none of the ML or Firebase imports
+    ENABLE_CHAT: bool = True
+
+    # "remote" delegates spaCy/SBERT/RAG to the nlp-service at NLP_SERVICE_URL,
+    # so API processes load no models and inference scales on its own
+    INFERENCE_MODE: Literal["local", "remote"] = "local"
     NLP_SERVICE_URL: str = "http://nlp-service:8001/process"
+    NLP_SERVICE_TIMEOUT_SECONDS: float = 5.0
+    # Streaming RAG answers are read for at most this long
+    NLP_SERVICE_STREAM_TIMEOUT_SECONDS: float = 60.0
+    NLP_SERVICE_MAX_CONNECTIONS: int = 20
     ALLOWED_ORIGINS: Union[str, List[str]] = "http://localhost:3000"
 
     @field_validator("ALLOWED_ORIGINS", mode="before")
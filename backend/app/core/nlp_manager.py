@@ -1,12 +1,25 @@
-import threading
-from typing import Optional
-import spacy
-from sentence_transformers import SentenceTransformer
-from langchain_mistralai import ChatMistralAI
-from ..services.nlp_service import build_vector_store, create_rag_chain, get_recipes_from_db
-from sqlalchemy.orm import Session
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from fastapi import FastAPI
+from ..services.nlp_service import (
+    SPACY_MODEL_NAME, extract_intent_and_entities, load_intent_pipeline,
+)
+from ..services.recipe_catalog import CatalogSnapshot, RecipeCatalog
+from ..services.inference import get_inference_executor
+from ..services.recipe_embeddings import RecipeEmbeddingIndex
 import logging
 from ..core import VectorStoreInitializationError
+from ..core.config import settings
+from ..core.cache import TTLCache
+from ..core.semantic_cache import SemanticCache
+
+# spaCy, sentence-transformers (torch) and LangChain take seconds to import;
+# they are only imported by warm_up, so CRUD-only processes never load them.
+if TYPE_CHECKING:
+    import spacy
+    from sentence_transformers import SentenceTransformer
 
 logger = logging.getLogger("chef_ai.nlp_manager")
 
@@ -15,29 +28,177 @@ class VectorStoreInitializationError(Exception):
     pass
 
 class NLPManager:
-    _lock = threading.Lock()
-    _nlp: Optional[spacy.Language] = None
-    _sbert: Optional[SentenceTransformer] = None
+    SBERT_MODEL_NAME = "all-MiniLM-L6-v2"
+    # Warm-up component -> class attribute holding it
+    COMPONENTS = {
+        "spacy": "_nlp",
+        "sbert": "_sbert",
+        "recipe_index": "_recipe_index",
+        "vector_store": "_vector_store",
+        "rag_chain": "_rag_chain",
+    }
+    # Rule mode needs these; RAG additionally needs rag_chain, checked per request
+    REQUIRED = ("spacy", "sbert")
+
+    _nlp: Optional["spacy.Language"] = None
+    _sbert: Optional["SentenceTransformer"] = None
+    _recipe_index: Optional[RecipeEmbeddingIndex] = None
     _vector_store = None
     _rag_chain = None
+    # Catalog version the vector store was last synced to
+    _vector_store_version = 0
+    _status: Dict[str, Dict[str, Any]] = {name: {"state": "pending"} for name in COMPONENTS}
+    _answer_cache = SemanticCache(
+        settings.RAG_ANSWER_CACHE_SIZE,
+        settings.RAG_ANSWER_CACHE_TTL_SECONDS,
+        settings.RAG_ANSWER_CACHE_THRESHOLD,
+    )
+    _reformulation_cache = TTLCache(
+        settings.RAG_REFORMULATION_CACHE_SIZE,
+        settings.RAG_REFORMULATION_CACHE_TTL_SECONDS,
+    )
+
+    @classmethod
+    async def warm_up(cls):
+        """
+        Loads every component off the event loop: spaCy and SBERT in
+        parallel, then the recipe embedding index and the vector store in
+        parallel (both need SBERT), then the RAG chain. A failed component
+        is recorded in status() and leaves the others usable.
+        """
+        await asyncio.gather(
+            cls._load("spacy", cls._load_spacy),
+            cls._load("sbert", cls._load_sbert),
+        )
+        if cls._sbert is None:
+            return
+        try:
+            catalog = await asyncio.to_thread(RecipeCatalog.snapshot)
+        except Exception as e:
+            logger.error(f"Recipe catalog unavailable; skipping index and RAG warm-up: {e}", exc_info=True)
+            for name in ("recipe_index", "vector_store", "rag_chain"):
+                cls._status[name] = {"state": "failed", "error": f"recipe catalog unavailable: {e}"}
+            return
+        await asyncio.gather(
+            cls._load("recipe_index", cls._build_recipe_index, catalog),
+            cls._load("vector_store", cls._build_vector_store, catalog),
+        )
+        cls._vector_store_version = catalog.version
+        RecipeCatalog.subscribe(cls._on_catalog_update)
+        if cls._vector_store is not None:
+            await cls._load("rag_chain", cls._build_rag_chain)
+        else:
+            cls._status["rag_chain"] = {"state": "failed", "error": "vector store unavailable"}
+        logger.info(f"NLPManager warm-up done: {cls.status()}")
+
+    @classmethod
+    async def _load(cls, name: str, fn, *args, **kwargs):
+        with cls._timed(name):
+            value = await asyncio.to_thread(fn, *args, **kwargs)
+            if value is None:
+                raise RuntimeError(f"{name} did not initialize")
+            setattr(cls, cls.COMPONENTS[name], value)
+
+    @classmethod
+    @contextmanager
+    def _timed(cls, name: str):
+        cls._status[name] = {"state": "loading"}
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            logger.error(f"Error loading NLP component {name}: {e}", exc_info=True)
+            cls._status[name] = {"state": "failed", "error": str(e)}
+        else:
+            cls._status[name] = {"state": "ready"}
+        cls._status[name]["seconds"] = round(time.perf_counter() - started, 3)
+
+    @classmethod
+    def _load_sbert(cls) -> "SentenceTransformer":
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(cls.SBERT_MODEL_NAME)
+
+    @classmethod
+    def _build_recipe_index(cls, catalog: CatalogSnapshot) -> RecipeEmbeddingIndex:
+        index = RecipeEmbeddingIndex(settings.RECIPE_EMBEDDINGS_PATH, cls.SBERT_MODEL_NAME)
+        index.load()
+        index.sync(catalog.recipes, cls._sbert)
+        return index
+
+    @classmethod
+    def _build_vector_store(cls, catalog: CatalogSnapshot):
+        from ..services.rag import build_vector_store
+        from ..services.rag_embeddings import get_rag_embeddings
+
+        store = build_vector_store(
+            catalog.recipes, catalog.watermark,
+            embeddings=get_rag_embeddings(cls._sbert, cls.SBERT_MODEL_NAME),
+        )
+        if store is None:
+            raise VectorStoreInitializationError("Failed to initialize vector store.")
+        return store
+
+    @classmethod
+    def _build_rag_chain(cls):
+        from langchain_mistralai import ChatMistralAI
+        from ..services.rag import create_rag_chain
+
+        return create_rag_chain(
+            ChatMistralAI(), cls._vector_store,
+            answer_cache=cls._answer_cache, embed_query=cls._embed_query,
+            reformulation_cache=cls._reformulation_cache,
+            history_turns=settings.RAG_REFORMULATION_HISTORY_TURNS,
+        )
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        return all(cls._status[name]["state"] == "ready" for name in cls.REQUIRED)
+
+    @classmethod
+    def status(cls) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(state) for name, state in cls._status.items()}
+
+    @classmethod
+    def _load_spacy(cls) -> "spacy.Language":
+        """
+        Loads the shared intent pipeline and logs what a per-call
+        spacy.load used to cost against a call on the warm pipeline.
+        """
+        started = time.perf_counter()
+        nlp = load_intent_pipeline()
+        load_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        extract_intent_and_entities("What can I cook with chicken and rice?", nlp=nlp)
+        call_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"spaCy {SPACY_MODEL_NAME} (components: {', '.join(nlp.pipe_names)}): "
+            f"load {load_ms:.0f} ms (old per-call cost), warm call {call_ms:.1f} ms"
+        )
+        return nlp
+
+    @classmethod
+    def _on_catalog_update(cls, snapshot: CatalogSnapshot):
+        if cls._recipe_index is not None and cls._sbert is not None:
+            cls._recipe_index.sync(snapshot.recipes, cls._sbert)
+        if cls._vector_store is not None and snapshot.version > cls._vector_store_version:
+            from ..services.rag import sync_vector_store
+
+            # Snapshots published before we subscribed were never seen;
+            # after such a gap, compare the whole catalog once
+            contiguous = snapshot.version == cls._vector_store_version + 1
+            sync_vector_store(
+                cls._vector_store, snapshot.recipes, snapshot.watermark,
+                changed_ids=snapshot.changed_ids if contiguous else None,
+                removed_ids=snapshot.removed_ids,
+            )
+            cls._vector_store_version = snapshot.version
+        # Cached answers quote recipe contents that may just have changed
+        cls._answer_cache.clear()
 
     @classmethod
-    def init(cls, db: Session):
-        with cls._lock:
-            if cls._nlp is None:
-                cls._nlp = spacy.load("en_core_web_sm")
-                cls._sbert = SentenceTransformer("all-MiniLM-L6-v2")
-                try:
-                    recipes = get_recipes_from_db(db)
-                    cls._vector_store = build_vector_store(recipes)
-                    if cls._vector_store:
-                        cls._rag_chain = create_rag_chain(ChatMistralAI(), cls._vector_store)
-                    else:
-                        logger.error("Failed to initialize vector store.")
-                        raise VectorStoreInitializationError("Failed to initialize vector store.")
-                except Exception as e:
-                    logger.error(f"Error during NLPManager initialization: {e}", exc_info=True)
-                    raise  # Re-raise the exception to prevent silent failure
+    async def _embed_query(cls, query: str):
+        return await get_inference_executor().encode(cls._sbert, query)
 
     @classmethod
     def get_spacy(cls):
@@ -47,6 +208,27 @@ class NLPManager:
     def get_sbert(cls):
         return cls._sbert
 
+    @classmethod
+    def get_recipe_index(cls) -> Optional[RecipeEmbeddingIndex]:
+        return cls._recipe_index
+
     @classmethod
     def get_rag_chain(cls):
-        return cls._rag_chain
\ No newline at end of file
+        return cls._rag_chain
+
+    @classmethod
+    def answer_cache_stats(cls):
+        return cls._answer_cache.stats()
+
+    @classmethod
+    def reformulation_cache_stats(cls):
+        return cls._reformulation_cache.stats()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background: the app starts serving /ping and /ready
+    # at once, and chat routes answer 503 until the models are in.
+    task = asyncio.create_task(NLPManager.warm_up())
+    yield
+    task.cancel()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Text, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Text, Float, DateTime, Index, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship, joinedload
 from .base import Base
@@ -37,24 +37,34 @@ class PantryItem(Base):
 
     user         = relationship("User", back_populates="pantry_items")
 
+    __table_args__ = (
+        Index("uq_pantry_items_user_id_lower_name", user_id, func.lower(name), unique=True),
+    )
+
 class Recipe(Base):
     __tablename__ = "recipes"
     id               = Column(Integer, primary_key=True, index=True)
     title            = Column(String, nullable=False)
     instructions     = Column(Text, nullable=False)
-    prep_time        = Column(Integer, default=30)
+    prep_time        = Column(Integer, default=30, index=True)
     servings         = Column(Integer, default=4)
     cooking_method   = Column(String, default="any")
     diet             = Column(String, default="any")
+    updated_at       = Column(DateTime(timezone=True), nullable=False, index=True,
+                              server_default=func.now(), onupdate=func.now())
 
     recipe_ingredients = relationship(
         "RecipeIngredient", back_populates="recipe", cascade="all,delete"
     )
 
+    __table_args__ = (
+        Index("ix_recipes_diet_cooking_method_prep_time", diet, cooking_method, prep_time),
+    )
+
 class RecipeIngredient(Base):
     __tablename__ = "recipe_ingredients"
     recipe_id     = Column(Integer, ForeignKey("recipes.id"), primary_key=True)
-    ingredient_id = Column(Integer, ForeignKey("ingredients.id"), primary_key=True)
+    ingredient_id = Column(Integer, ForeignKey("ingredients.id"), primary_key=True, index=True)
     quantity      = Column(Float, default=1.0)
     unit          = Column(String, default="unit")
 
@@ -66,3 +76,7 @@ class Ingredient(Base):
     id       = Column(Integer, primary_key=True, index=True)
     name     = Column(String, unique=True, nullable=False)
     category = Column(String)
+
+    __table_args__ = (
+        Index("ix_ingredients_lower_name", func.lower(name)),
+    )
@@ -0,0 +1,39 @@
+# backend/app/db/query_count.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statements executed in the current request (or count_queries block);
+# None outside of one. Context variables follow the request across awaits.
+_statements: ContextVar[Optional[List[str]]] = ContextVar("db_statements", default=None)
+
+
+def _record(conn, cursor, statement, parameters, context, executemany):
+    statements = _statements.get()
+    if statements is not None:
+        statements.append(statement)
+
+
+def instrument(engine: Engine) -> None:
+    """Counts every statement `engine` executes; for async engines pass .sync_engine."""
+    event.listen(engine, "before_cursor_execute", _record)
+
+
+@contextmanager
+def count_queries() -> Iterator[List[str]]:
+    """
+    Collects the statements executed inside the block, e.g.
+
+        with count_queries() as queries:
+            await get_user_profile_from_db_async(db, user_id)
+        assert len(queries) == 1
+    """
+    statements: List[str] = []
+    token = _statements.set(statements)
+    try:
+        yield statements
+    finally:
+        _statements.reset(token)
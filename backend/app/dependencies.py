@@ -1,12 +1,16 @@
 # backend/app/dependencies.py
 
-from typing import Generator
+from typing import TYPE_CHECKING, AsyncGenerator, Generator, Optional
 
-from fastapi import Depends
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .core.nlp_manager import NLPManager
-from .db.session import SessionLocal
+from .core.config import settings
+from .db.session import AsyncSessionLocal, SessionLocal
+
+if TYPE_CHECKING:
+    from .core.nlp_manager import NLPManager
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -18,10 +22,27 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
-def get_nlp_manager(db: Session = Depends(get_db)) -> NLPManager:
+async def get_db_async() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Yields an AsyncSession from the pooled asyncpg engine, closing it when done.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_nlp_manager() -> Optional["NLPManager"]:
     """
-    Thread-safe one-time initialization of RAG chain + vector store.
-    Returns the NLPManager class (with .get_rag_chain() etc.).
+    Returns the NLPManager class (with .get_rag_chain() etc.) once the
+    startup warm-up has loaded its models; 503 until then. None when
+    INFERENCE_MODE is "remote": the nlp-service holds the models.
     """
-    NLPManager.init(db)
+    if settings.INFERENCE_MODE == "remote":
+        return None
+    from .core.nlp_manager import NLPManager
+
+    if not NLPManager.is_ready():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="NLP models are still loading",
+            headers={"Retry-After": "5"},
+        )
     return NLPManager
@@ -1,11 +1,14 @@
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import AsyncExitStack, asynccontextmanager
-from .services.firebase import lifespan as firebase_lifespan
+from .services.auth import principal_cache_stats
+from .services.passwords import lifespan as passwords_lifespan, get_password_hasher
 
 from .core.config import settings
-from .routers import users, pantry, settings as settings_router, chat
+from .db.query_count import count_queries
+from .routers import users, pantry, settings as settings_router
 
 # ─────────── Logging setup ───────────
 logging.basicConfig(level=logging.INFO)
@@ -16,10 +19,40 @@ logger = logging.getLogger("chef_ai-backend")
 # it exactly matches the browser’s Origin header.
 normalized_origins = [str(url).rstrip("/") for url in settings.ALLOWED_ORIGINS]
 
+def _chat_lifespans():
+    # Imported only when chat is enabled; they pull in numpy, httpx and the
+    # Firebase client, and start the model warm-up
+    from .services.firebase import lifespan as firebase_lifespan
+    from .services.history_cache import lifespan as history_cache_lifespan
+    from .services.recipe_catalog import lifespan as recipe_catalog_lifespan
+    from .services.spoonacular import lifespan as spoonacular_lifespan
+
+    if settings.INFERENCE_MODE == "remote":
+        # Models live in the nlp-service; this process only holds a client
+        from .services.nlp_client import lifespan as nlp_client_lifespan
+
+        inference_lifespans = [nlp_client_lifespan]
+    else:
+        from .services.inference import lifespan as inference_lifespan
+        from .core.nlp_manager import lifespan as nlp_lifespan
+
+        inference_lifespans = [inference_lifespan, nlp_lifespan]
+
+    return [
+        history_cache_lifespan,
+        firebase_lifespan,
+        recipe_catalog_lifespan,
+        *inference_lifespans,
+        spoonacular_lifespan,
+    ]
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with AsyncExitStack() as stack:
-        await stack.enter_async_context(firebase_lifespan(app))
+        await stack.enter_async_context(passwords_lifespan(app))
+        if settings.ENABLE_CHAT:
+            for chat_lifespan in _chat_lifespans():
+                await stack.enter_async_context(chat_lifespan(app))
 
         # Logging startup
         logger.info("→ raw ALLOWED_ORIGINS from settings: %s", settings.ALLOWED_ORIGINS)
@@ -45,15 +78,75 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-LLM-Calls", "X-DB-Queries"],
 )
 
+# ─────────── Query counting ───────────
+@app.middleware("http")
+async def db_query_count(request: Request, call_next):
+    with count_queries() as queries:
+        response = await call_next(request)
+    response.headers["X-DB-Queries"] = str(len(queries))
+    if len(queries) > settings.DB_QUERY_WARN_THRESHOLD:
+        logger.warning(f"{request.method} {request.url.path} ran {len(queries)} DB queries")
+    return response
+
 # ─────────── Include routers ───────────
 app.include_router(users.router)
 app.include_router(pantry.router)
 app.include_router(settings_router.router)
-app.include_router(chat.router)
+if settings.ENABLE_CHAT:
+    # Chat routers import LangChain at module level
+    from .routers import chat
+    app.include_router(chat.router)
 
 # ─────────── Health check ───────────
 @app.get("/ping", tags=["Health"])
 async def ping():
     return {"status": "healthy"}
+
+@app.get("/ready", tags=["Health"])
+async def ready():
+    if not settings.ENABLE_CHAT:
+        return {"ready": True, "components": {}}
+    if settings.INFERENCE_MODE == "remote":
+        return {"ready": True, "components": {"inference": {"state": "remote"}}}
+    from .core.nlp_manager import NLPManager
+
+    body = {"ready": NLPManager.is_ready(), "components": NLPManager.status()}
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+@app.get("/metrics/passwords", tags=["Health"])
+async def password_metrics():
+    return get_password_hasher().stats()
+
+@app.get("/metrics/caches", tags=["Health"])
+async def cache_metrics():
+    caches = {"principals": principal_cache_stats()}
+    if settings.ENABLE_CHAT:
+        from .services.history_cache import get_history_cache
+        from .services.spoonacular import cache_stats as spoonacular_cache_stats
+
+        caches.update({
+            "spoonacular": spoonacular_cache_stats(),
+            "chat_history": get_history_cache().stats(),
+        })
+        if settings.INFERENCE_MODE == "local":
+            from .core.nlp_manager import NLPManager
+
+            caches.update({
+                "rag_answers": NLPManager.answer_cache_stats(),
+                "rag_reformulations": NLPManager.reformulation_cache_stats(),
+            })
+    return caches
+
+if settings.ENABLE_CHAT:
+    @app.get("/metrics/inference", tags=["Health"])
+    async def inference_metrics():
+        if settings.INFERENCE_MODE == "remote":
+            from .services.nlp_client import get_nlp_client
+
+            return get_nlp_client().stats()
+        from .services.inference import get_inference_executor
+
+        return get_inference_executor().stats()
@@ -1,11 +1,12 @@
 from datetime import datetime, timezone
 import uuid
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...schemas.chat import ChatRequest, ChatResponse
-from ...dependencies import get_db
-from ...services.auth import get_current_active_user
+from ...dependencies import get_db_async
+from ...services.auth import get_current_active_user_async
+from ...services.nlp_service import get_user_profile_from_db_async
 from ...services.spoonacular import fetch_recipes_online
 
 router = APIRouter(tags=["Chat-Online"])
@@ -14,13 +15,14 @@ router = APIRouter(tags=["Chat-Online"])
 @router.post("", response_model=ChatResponse)
 async def chat_online(
     req: ChatRequest,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_async),
+    current_user = Depends(get_current_active_user_async),
 ):
     if req.mode != "online":
         raise HTTPException(status_code=400, detail="Invalid mode")
 
-    pantry = [i.name for i in current_user.pantry_items]
+    # no lazy loads on an AsyncSession; fetch the pantry explicitly
+    pantry = (await get_user_profile_from_db_async(db, current_user.id))["pantry"]
     if not pantry:
         return ChatResponse(
             message="Your pantry is empty. Add ingredients first.",
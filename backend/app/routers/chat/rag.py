@@ -1,33 +1,35 @@
 # backend/app/routers/chat/rag.py
+import json
 import logging
 import uuid
 from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 from ...schemas.chat import ChatRequest, ChatResponse
-from ...dependencies import get_db, get_nlp_manager
-from ...services.auth import get_current_active_user
+from ...dependencies import get_nlp_manager
+from ...services.auth import get_current_active_user_async
 from ...services.firebase import get_firebase_client
+from ...services.llm_calls import LLMCallCounter
 
 logger = logging.getLogger("chef_ai.chat_rag")
 
 router = APIRouter(tags=["Chat-RAG"])
 
-@router.post("", response_model=ChatResponse)
-async def chat_rag(
-    req: ChatRequest,
-    nlp_mgr=Depends(get_nlp_manager),
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_active_user),
-):
+
+def _get_chain(req: ChatRequest, nlp_mgr):
+    """The local RAG chain; None when inference is delegated to the nlp-service."""
     if req.mode != "rag":
         logger.error("Invalid mode %r on /chat/rag", req.mode)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid mode; must be 'rag'",
         )
+    if nlp_mgr is None:
+        return None
 
     chain = nlp_mgr.get_rag_chain()
     if chain is None:
@@ -36,45 +38,166 @@ async def chat_rag(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="RAG service unavailable",
         )
+    return chain
 
-    session_id = req.session_id or str(uuid.uuid4())
-    firebase = get_firebase_client()
 
-    # 🧠 Try loading chat history from Firestore
+async def _load_history(firebase, session_id: str) -> List[Dict[str, str]]:
     chat_history = []
     try:
-        messages = await firebase.get_messages(session_id)
-        for m in messages[-10:]:  # limit to last 10 turns
+        for m in await firebase.get_messages(session_id):
             chat_history.append({"role": "user", "content": m["query"]})
             chat_history.append({"role": "bot", "content": m["response"]})
     except Exception as e:
         logger.warning(f"Failed to load chat history for session {session_id}: {e}")
+    return chat_history
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-    # 🧠 Run the RAG chain
+
+async def _run_chain(chain, inputs: Dict[str, Any]) -> Tuple[str, int]:
+    if chain is None:
+        from ...services.nlp_client import get_nlp_client
+
+        out = await get_nlp_client().rag(inputs["input"], inputs["chat_history"], inputs["session_id"])
+        return out["answer"], out["llm_calls"]
+    llm_calls = LLMCallCounter()
     try:
-        out = await chain.ainvoke({
-            "input": req.query,
-            "chat_history": chat_history,
-        })
+        out = await chain.ainvoke(inputs, config={"callbacks": [llm_calls]})
     except Exception:
         logger.exception("Error running RAG chain")
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="RAG processing failed; check server logs",
         )
+    return out.get("answer", ""), llm_calls.calls
+
+
+async def _stream_chain(chain, inputs: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+    """(event, data) pairs: `recipes`, `token`s, then `done` with the LLM call count."""
+    if chain is None:
+        from ...services.nlp_client import get_nlp_client
+
+        async for event in get_nlp_client().rag_stream(
+            inputs["input"], inputs["chat_history"], inputs["session_id"]
+        ):
+            yield event
+        return
+    llm_calls = LLMCallCounter()
+    async for chunk in chain.astream(inputs, config={"callbacks": [llm_calls]}):
+        if "context" in chunk:
+            ids = list(dict.fromkeys(
+                doc.metadata.get("id") for doc in chunk["context"]
+                if doc.metadata.get("id") is not None
+            ))
+            yield "recipes", {"recipe_ids": ids}
+        if chunk.get("answer"):
+            yield "token", {"token": chunk["answer"]}
+    yield "done", {"llm_calls": llm_calls.calls}
+
+
+@router.post("", response_model=ChatResponse)
+async def chat_rag(
+    req: ChatRequest,
+    response: Response,
+    nlp_mgr=Depends(get_nlp_manager),
+    current_user=Depends(get_current_active_user_async),
+):
+    chain = _get_chain(req, nlp_mgr)
+    session_id = req.session_id or str(uuid.uuid4())
+    firebase = get_firebase_client()
+
+    # 🧠 Try loading chat history from Firestore
+    chat_history = await _load_history(firebase, session_id)
+
+    # 🧠 Run the RAG chain (here or on the nlp-service)
+    answer, llm_calls = await _run_chain(chain, {
+        "input": req.query,
+        "chat_history": chat_history,
+        "session_id": session_id,
+    })
+    logger.info(f"RAG request for session {session_id} made {llm_calls} LLM call(s)")
+    response.headers["X-LLM-Calls"] = str(llm_calls)
 
     # ✅ Save interaction
     await firebase.save_chat_history(
         user_id=current_user.id,
         session_id=session_id,
         query=req.query,
-        response=out.get("answer", "")
+        response=answer
     )
 
     return ChatResponse(
-        message=out.get("answer", ""),
-        recommendations=out.get("recommendations", []),
+        message=answer,
+        recommendations=[],
         session_id=session_id,
         timestamp=datetime.now(timezone.utc).isoformat(),
         history=chat_history
     )
+
+
+@router.post("/stream")
+async def chat_rag_stream(
+    req: ChatRequest,
+    nlp_mgr=Depends(get_nlp_manager),
+    current_user=Depends(get_current_active_user_async),
+):
+    """
+    Server-sent events variant of /chat/rag. Emits a `recipes` event with the
+    ids of the retrieved recipes, one `token` event per answer chunk as the
+    LLM produces it, then `done` with the number of LLM calls made (or
+    `error`). The full answer is saved to Firestore only once `done` has
+    been sent; errored or disconnected streams are not saved.
+    """
+    chain = _get_chain(req, nlp_mgr)
+    session_id = req.session_id or str(uuid.uuid4())
+    firebase = get_firebase_client()
+    chat_history = await _load_history(firebase, session_id)
+    answer: List[str] = []
+    completed = False
+
+    async def events() -> AsyncIterator[str]:
+        nonlocal completed
+        llm_calls = 0
+        try:
+            async for event, data in _stream_chain(chain, {
+                "input": req.query,
+                "chat_history": chat_history,
+                "session_id": session_id,
+            }):
+                if event == "token":
+                    answer.append(data["token"])
+                elif event == "done":
+                    llm_calls = data["llm_calls"]
+                    continue
+                elif event == "error":
+                    raise RuntimeError(data.get("detail"))
+                yield _sse(event, data)
+        except Exception:
+            logger.exception("Error streaming RAG chain")
+            yield _sse("error", {"detail": "RAG processing failed; check server logs"})
+            return
+        logger.info(f"RAG stream for session {session_id} made {llm_calls} LLM call(s)")
+        yield _sse("done", {
+            "session_id": session_id,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "llm_calls": llm_calls,
+        })
+        completed = True
+
+    async def save():
+        if completed and answer:
+            await firebase.save_chat_history(
+                user_id=current_user.id,
+                session_id=session_id,
+                query=req.query,
+                response="".join(answer),
+            )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(save),
+    )
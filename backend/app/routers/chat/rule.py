@@ -2,16 +2,18 @@
 
 from datetime import datetime, timezone
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...core.config import settings
 from ...schemas.chat import ChatRequest, ChatResponse, RecipeDetail
-from ...dependencies import get_db, get_nlp_manager
-from ...services.auth import get_current_active_user
+from ...dependencies import get_db_async, get_nlp_manager
+from ...services.auth import get_current_active_user_async
+from ...services.inference import get_inference_executor
+from ...services.recipe_catalog import RecipeCatalog
 from ...services.nlp_service import (
-    get_recipes_from_db,
-    get_user_profile_from_db,
-    extract_intent_and_entities,
+    get_candidate_recipes_from_db_async,
+    get_user_profile_from_db_async,
     filter_recipes,
     rank_recipes,
     personalize_response,
@@ -19,20 +21,46 @@ from ...services.nlp_service import (
 
 router = APIRouter(tags=["Chat-Rule"])
 
+
+async def _intent(query: str, nlp_mgr):
+    if nlp_mgr is None:
+        from ...services.nlp_client import get_nlp_client
+
+        return await get_nlp_client().intent(query)
+    return await get_inference_executor().intent(nlp_mgr.get_spacy(), query)
+
+
+async def _rank(query: str, recipes, nlp_mgr):
+    if not recipes:
+        return recipes
+    if nlp_mgr is None:
+        from ...services.nlp_client import get_nlp_client
+
+        by_id = {r["id"]: r for r in recipes}
+        ranked = [by_id.pop(rid) for rid in await get_nlp_client().rank(query, list(by_id)) if rid in by_id]
+        # Ids the nlp-service does not know (yet) keep their original order, last
+        return ranked + list(by_id.values())
+    sbert = nlp_mgr.get_sbert()
+    if sbert is None:
+        return recipes
+    executor = get_inference_executor()
+    qemb = await executor.encode(sbert, query)
+    return await executor.run(rank_recipes, query, recipes, sbert, nlp_mgr.get_recipe_index(), qemb)
+
+
 @router.post("", response_model=ChatResponse)
 async def chat_rule(
     req: ChatRequest,
     nlp_mgr = Depends(get_nlp_manager),
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_async),
+    current_user = Depends(get_current_active_user_async),
 ):
     if req.mode != "rule":
         raise HTTPException(status_code=400, detail="Invalid mode")
 
-    recipes = get_recipes_from_db(db)
-    profile = get_user_profile_from_db(db, current_user.id)
+    profile = await get_user_profile_from_db_async(db, current_user.id)
 
-    intent, _ = extract_intent_and_entities(req.query)
+    intent, _ = await _intent(req.query, nlp_mgr)
     if intent != "suggest_dish":
         fallback_msg = "Try asking what you can cook with the ingredients you have."
         return ChatResponse(
@@ -46,8 +74,14 @@ async def chat_rule(
             ]
         )
 
-    filtered = filter_recipes(recipes, profile["pantry"], profile["preferences"])
-    ranked = rank_recipes(req.query, filtered, model=nlp_mgr.get_sbert())
+    if settings.RULE_FILTER_IN_DB:
+        filtered = await get_candidate_recipes_from_db_async(db, current_user.id, profile["preferences"])
+    else:
+        catalog = RecipeCatalog.snapshot()
+        filtered = filter_recipes(
+            catalog.recipes, profile["pantry"], profile["preferences"], index=catalog.filter_index
+        )
+    ranked = await _rank(req.query, filtered, nlp_mgr)
     msg = personalize_response(req.query, ranked)
     top_recipes = ranked[:3]
 
@@ -2,6 +2,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from typing import List
 
 from ..db.models import PantryItem, User
@@ -17,21 +18,17 @@ def add_item(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    # Check if the item already exists for the user (case-insensitive)
-    existing = db.query(PantryItem).filter(
-        PantryItem.user_id == current_user.id,
-        func.lower(PantryItem.name) == item.name.lower()
-    ).first()
-
-    if existing:
+    # uq_pantry_items_user_id_lower_name rejects case-insensitive duplicates
+    pi = PantryItem(user_id=current_user.id, **item.dict())
+    db.add(pi)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(
             status_code=400,
             detail=f"Item '{item.name}' already exists in your pantry."
         )
-
-    pi = PantryItem(user_id=current_user.id, **item.dict())
-    db.add(pi)
-    db.commit()
     db.refresh(pi)
     return pi
 
@@ -1,30 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
 
 from ..db.models import User
 from ..schemas.user import UserCreate, UserOut, ChangePasswordRequest, Token, UserUpdate
-from ..dependencies import get_db
+from ..dependencies import get_db, get_db_async
 from ..services.auth import (
-    get_password_hash, authenticate_user,
-    create_access_token, get_current_active_user, verify_password
+    get_password_hash_async, authenticate_user_async,
+    create_access_token, get_current_active_user, get_current_active_user_async,
+    verify_password_async,
 )
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 @router.post("/register", response_model=UserOut)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db_async)):
+    existing = await db.execute(select(User.id).where(
         (User.username == user.username) | (User.email == user.email)
-    ).first():
+    ).limit(1))
+    if existing.first():
         raise HTTPException(status_code=400, detail="Username or email already exists")
     new = User(
         username=user.username,
         email=user.email,
         full_name=user.full_name,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=await get_password_hash_async(user.password),
     )
-    db.add(new); db.commit(); db.refresh(new)
+    db.add(new); await db.commit(); await db.refresh(new)
     return new
 
 @router.put("/update", response_model=UserOut)
@@ -33,6 +37,11 @@ def update_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
+    """
+    Authenticated users are cached per worker (services.auth). This worker
+    sees the change at once; other workers may serve the old email or name
+    for up to AUTH_USER_CACHE_TTL_SECONDS.
+    """
     if payload.email:
         current_user.email = payload.email
     if payload.full_name:
@@ -41,8 +50,8 @@ def update_user(
     return current_user
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db_async)):
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     token = create_access_token({"sub": user.username, "user_id": user.id})
@@ -53,12 +62,18 @@ def read_me(current_user: User = Depends(get_current_active_user)):
     return current_user
 
 @router.put("/change-password", status_code=status.HTTP_204_NO_CONTENT)
-def change_password(
+async def change_password(
     payload: ChangePasswordRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db_async),
+    current_user: User = Depends(get_current_active_user_async)
 ):
-    if not verify_password(payload.old_password, current_user.hashed_password):
+    """
+    The password hash is never cached, so logins on every worker use the new
+    password at once. Existing tokens stay valid until they expire.
+    """
+    # Not part of the cached principal
+    await db.refresh(current_user, ["hashed_password"])
+    if not await verify_password_async(payload.old_password, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Old password incorrect")
-    current_user.hashed_password = get_password_hash(payload.new_password)
-    db.commit()
+    current_user.hashed_password = await get_password_hash_async(payload.new_password)
+    await db.commit()
@@ -2,32 +2,30 @@
 
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, Generator
+from typing import Optional
 
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from ..core.cache import TTLCache
 from ..core.config import settings
-from ..db.session import SessionLocal
+from ..dependencies import get_db, get_db_async
 from ..db.models import User
+from .passwords import get_password_hasher, pwd_context
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
 logger = logging.getLogger("uvicorn.error")
 
-def get_db_session() -> Generator[Session, None, None]:
-    """
-    FastAPI dependency that yields a SQLAlchemy Session and closes it afterwards.
-    """
-    db: Session = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Column values of recently authenticated users, keyed by token subject.
+# Only what request handlers read; hashed_password stays in the database
+# and is loaded on demand (see change_password).
+_principals = TTLCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL_SECONDS)
+PRINCIPAL_COLUMNS = ("id", "username", "email", "full_name", "is_active", "is_verified")
 
 
 def verify_password(plain: str, hashed: str) -> bool:
@@ -47,6 +45,35 @@ def authenticate_user(
     return user
 
 
+async def get_password_hash_async(pw: str) -> str:
+    return await get_password_hasher().hash(pw)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    valid, _ = await get_password_hasher().verify_and_update(plain, hashed)
+    return valid
+
+
+async def authenticate_user_async(
+    db: AsyncSession, username: str, password: str
+) -> Optional[User]:
+    """
+    Like authenticate_user, with bcrypt off the event loop. A hash made
+    with a different BCRYPT_ROUNDS is replaced after a successful check.
+    """
+    user = (await db.execute(select(User).where(User.username == username))).scalar_one_or_none()
+    if not user:
+        return None
+    valid, new_hash = await get_password_hasher().verify_and_update(password, user.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        logger.info(f"Re-hashed password of '{username}' with {settings.BCRYPT_ROUNDS} rounds")
+    return user
+
+
 def create_access_token(
     data: dict,
     expires_delta: timedelta | None = None
@@ -60,15 +87,15 @@ def create_access_token(
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db_session),
-) -> User:
-    creds_exc = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _token_subject(token: str) -> str:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -76,15 +103,60 @@ def get_current_user(
         username: str = payload.get("sub")
         if username is None:
             logger.warning("JWT payload missing 'sub'")
-            raise creds_exc
+            raise _credentials_exception()
     except JWTError as e:
         logger.error(f"JWT decode error: {e}")
-        raise creds_exc
+        raise _credentials_exception()
+    return username
+
+
+def _principal_row(user: User) -> dict:
+    return {key: getattr(user, key) for key in PRINCIPAL_COLUMNS}
+
+
+def _principal_instance(row: dict) -> User:
+    """Detached User built from cached columns, ready for merge(load=False)."""
+    user = User(**row)
+    make_transient_to_detached(user)
+    return user
+
 
+def invalidate_principal(username: str) -> None:
+    """Drops a cached principal; ORM updates of a User do this automatically."""
+    _principals.pop(username)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target: User):
+    # Covers update_user, change_password and deactivation; also the old
+    # username if it was just renamed. Process-local: other workers keep
+    # their cached principal, including is_active, for up to
+    # AUTH_USER_CACHE_TTL_SECONDS
+    history = inspect(target).attrs.username.history
+    for username in {target.username, *(history.deleted or ())}:
+        invalidate_principal(username)
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    """
+    The token's user, attached to the request's session. Within
+    AUTH_USER_CACHE_TTL_SECONDS of the last lookup this costs no query:
+    the cached row is merged in with load=False; relationships and columns
+    outside PRINCIPAL_COLUMNS still lazy-load from `db` when used.
+    """
+    username = _token_subject(token)
+    row = _principals.get(username)
+    if row is not None:
+        return db.merge(_principal_instance(row), load=False)
     user = db.query(User).filter(User.username == username).first()
     if user is None:
         logger.warning(f"User '{username}' not found")
-        raise creds_exc
+        raise _credentials_exception()
+    _principals.set(username, _principal_row(user))
     return user
 
 def get_current_active_user(
@@ -96,3 +168,33 @@ def get_current_active_user(
             detail="Inactive user",
         )
     return current_user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db_async),
+) -> User:
+    username = _token_subject(token)
+    row = _principals.get(username)
+    if row is not None:
+        return await db.merge(_principal_instance(row), load=False)
+    user = (await db.execute(select(User).where(User.username == username))).scalar_one_or_none()
+    if user is None:
+        logger.warning(f"User '{username}' not found")
+        raise _credentials_exception()
+    _principals.set(username, _principal_row(user))
+    return user
+
+async def get_current_active_user_async(
+    current_user: User = Depends(get_current_user_async),
+) -> User:
+    if not current_user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user",
+        )
+    return current_user
+
+
+def principal_cache_stats():
+    return _principals.stats()
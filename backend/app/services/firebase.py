@@ -1,65 +1,238 @@
+import asyncio
 import datetime
 import os
 import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import List, Optional
 from fastapi import FastAPI
-from firebase_admin import credentials, firestore, initialize_app
 from contextlib import asynccontextmanager
 from ..core.config import settings
+from .history_cache import get_history_cache
 
 logger = logging.getLogger("uvicorn.error")
 _db = None
+_writer: Optional["ChatHistoryWriter"] = None
+
+# Firestore caps a write batch at 500 operations; each turn costs two
+MAX_TURNS_PER_BATCH = 250
+
+
+@dataclass
+class ChatTurn:
+    user_id: int
+    session_id: str
+    query: str
+    response: str
+    created_at: datetime.datetime
+    # Fixed up front so a retried batch overwrites instead of duplicating
+    turn_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+
+def _commit_turns(db, turns: List[ChatTurn]) -> None:
+    from firebase_admin import firestore
+
+    batch = db.batch()
+    sessions = {}
+    for t in turns:
+        chat = db.collection("chats").document(t.session_id)
+        sessions[t.session_id] = (chat, t.user_id)
+        batch.set(chat.collection("messages").document(t.turn_id), {
+            "query": t.query,
+            "response": t.response,
+            "timestamp": t.created_at.isoformat(),
+            "created_at": t.created_at,
+        })
+    for chat, user_id in sessions.values():
+        batch.set(chat, {"user_id": user_id, "timestamp": firestore.SERVER_TIMESTAMP}, merge=True)
+    batch.commit()
+
+
+class ChatHistoryWriter:
+    """
+    Write-behind queue for chat turns. Requests enqueue and return at once;
+    a background task commits whatever has queued up within
+    `flush_interval_ms` as one Firestore batch, off the event loop. A
+    failed commit is retried `retries` times with exponential backoff
+    before the batch is dropped.
+    """
+
+    def __init__(
+        self,
+        db,
+        batch_size: int,
+        flush_interval_ms: float,
+        max_queue: int,
+        retries: int = 3,
+        backoff_ms: float = 200.0,
+    ):
+        self._db = db
+        self._batch_size = min(batch_size, MAX_TURNS_PER_BATCH)
+        self._window = flush_interval_ms / 1000
+        self._retries = retries
+        self._backoff = backoff_ms / 1000
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    def put(self, turn: ChatTurn) -> bool:
+        try:
+            self._queue.put_nowait(turn)
+            return True
+        except asyncio.QueueFull:
+            logger.error(f"Chat history queue full; dropping turn for session {turn.session_id}")
+            return False
+
+    async def close(self, timeout: float = 10.0):
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Chat history writer closed with {self._queue.qsize()} unsaved turns")
+        self._task.cancel()
+
+    async def _collect(self) -> List[ChatTurn]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self._window
+        while len(batch) < self._batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _commit(self, batch: List[ChatTurn]):
+        for attempt in range(self._retries + 1):
+            try:
+                await asyncio.to_thread(_commit_turns, self._db, batch)
+                return
+            except Exception as e:
+                if attempt == self._retries:
+                    logger.error(f"Firebase save error ({len(batch)} turns), dropping them: {e}")
+                    return
+                delay = self._backoff * 2 ** attempt
+                logger.warning(f"Firebase save error ({len(batch)} turns), retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            try:
+                await self._commit(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global _db
+    global _db, _writer
     cred_path = settings.FIREBASE_CREDENTIALS_PATH
     if cred_path and os.path.isfile(cred_path):
         try:
+            # Imported here: firebase_admin pulls in the Google Cloud client stack
+            from firebase_admin import credentials, firestore, initialize_app
+
             cred = credentials.Certificate(cred_path)
             initialize_app(cred)
             _db = firestore.client()
+            _writer = ChatHistoryWriter(
+                _db,
+                batch_size=settings.CHAT_HISTORY_WRITE_BATCH_SIZE,
+                flush_interval_ms=settings.CHAT_HISTORY_FLUSH_INTERVAL_MS,
+                max_queue=settings.CHAT_HISTORY_MAX_QUEUE,
+                retries=settings.CHAT_HISTORY_WRITE_RETRIES,
+                backoff_ms=settings.CHAT_HISTORY_RETRY_BACKOFF_MS,
+            )
             logger.info("✅ Firebase initialized")
         except Exception as e:
             logger.error(f"Firebase init failed: {e}")
     else:
         logger.warning("🔒 Firebase disabled (no credentials)")
     yield
+    if _writer is not None:
+        await _writer.close()
+        _writer = None
     logger.info("🔒 Backend shutdown")
 
+
 class FirebaseClient:
+    """
+    Chat history lives in chats/{session_id}/messages, one document per
+    turn, so the last N turns are read with an ordered, limited query.
+    Sessions written before that keep older turns in the chat document's
+    `messages` array; those come first, ahead of the subcollection. Recent sessions are
+    served from the history cache, which every saved turn is appended to.
+    """
+
     def __init__(self):
         global _db
         self._db = _db
 
     async def save_chat_history(self, user_id: int, session_id: str, query: str, response: str) -> bool:
-        if not self._db:
-            return False
+        """Queues the turn for the background writer; True if it was accepted."""
+        turn = ChatTurn(
+            user_id=user_id,
+            session_id=session_id,
+            query=query,
+            response=response,
+            created_at=datetime.datetime.now(datetime.timezone.utc),
+        )
         try:
-            ref = self._db.collection("chats").document(session_id)
-            ref.set({
-                "user_id": user_id,
-                "timestamp": firestore.SERVER_TIMESTAMP,
-                "messages": firestore.ArrayUnion([{
-                    "query": query,
-                    "response": response,
-                    "timestamp": datetime.datetime.utcnow().isoformat(),
-                }]),
-            }, merge=True)
-            return True
+            await get_history_cache().append(session_id, {
+                "query": query, "response": response, "timestamp": turn.created_at.isoformat(),
+            })
         except Exception as e:
-            logger.error(f"Firebase save error: {e}")
+            logger.warning(f"History cache append failed for session {session_id}: {e}")
+        if not self._db or _writer is None:
             return False
+        return _writer.put(turn)
 
-    async def get_messages(self, session_id: str) -> list:
-        if not self._db:
-            return []
-        try:
-            doc = self._db.collection("chats").document(session_id).get()
+    def _read_messages(self, session_id: str, limit: int) -> list:
+        from firebase_admin import firestore
+
+        chat = self._db.collection("chats").document(session_id)
+        recent = (
+            chat.collection("messages")
+            .order_by("created_at", direction=firestore.Query.DESCENDING)
+            .limit(limit)
+            .stream()
+        )
+        messages = [d.to_dict() for d in recent][::-1]
+        if len(messages) < limit:
+            # Legacy array turns all predate the subcollection
+            doc = chat.get()
             if doc.exists:
-                return doc.to_dict().get("messages", [])
+                messages = (doc.to_dict().get("messages") or []) + messages
+        return messages[-limit:]
+
+    async def get_messages(self, session_id: str, limit: Optional[int] = None) -> list:
+        """Last `limit` turns of the session, oldest first."""
+        limit = limit or settings.CHAT_HISTORY_TURNS
+        cache = get_history_cache()
+        try:
+            cached = await cache.get(session_id)
+            if cached is not None:
+                return cached[-limit:]
+        except Exception as e:
+            logger.warning(f"History cache read failed for session {session_id}: {e}")
+        messages = []
+        if self._db:
+            try:
+                messages = await asyncio.to_thread(self._read_messages, session_id, limit)
+            except Exception as e:
+                logger.error(f"Firebase get error: {e}")
+                return []
+        try:
+            await cache.set(session_id, messages)
         except Exception as e:
-            logger.error(f"Firebase get error: {e}")
-        return []
+            logger.warning(f"History cache write failed for session {session_id}: {e}")
+        return messages
 
 def get_firebase_client() -> FirebaseClient:
     return FirebaseClient()
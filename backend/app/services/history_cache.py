@@ -0,0 +1,173 @@
+# backend/app/services/history_cache.py
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+
+logger = logging.getLogger("chef_ai.history_cache")
+
+# Turn fields kept in the cache; Firestore documents carry more
+TURN_FIELDS = ("query", "response", "timestamp")
+
+
+def _turn(message: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: message.get(k) for k in TURN_FIELDS}
+
+
+class InProcessHistoryCache:
+    """
+    Last turns of recently active sessions, in this process. Only correct
+    while each session's turns are handled by the same worker; set
+    REDIS_URL when running several (get_history_cache otherwise shortens
+    the TTL to CHAT_HISTORY_LOCAL_TTL_SECONDS).
+    """
+
+    def __init__(self, maxsize: int, ttl: float, turns: int):
+        self._cache = TTLCache(maxsize, ttl)
+        self._turns = turns
+        # History reads only; appends also look sessions up in _cache
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        turns = self._cache.get(session_id)
+        if turns is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return list(turns)
+
+    async def set(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        self._cache.set(session_id, tuple(_turn(m) for m in messages[-self._turns:]))
+
+    async def append(self, session_id: str, message: Dict[str, Any]) -> None:
+        """Adds a turn to a cached session; unknown sessions stay uncached."""
+        turns = self._cache.get(session_id)
+        if turns is not None:
+            self._cache.set(session_id, (turns + (_turn(message),))[-self._turns:])
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "size": len(self._cache),
+            "maxsize": self._cache.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+class RedisHistoryCache:
+    """
+    Same contract as InProcessHistoryCache, shared by all workers. Each
+    session is a Redis list of JSON turns behind an empty marker element,
+    so a session with no turns yet is still cached (Redis drops empty
+    lists). Any client with the redis.asyncio API can be passed in.
+    """
+
+    KEY_PREFIX = "chat_history:"
+    # Append only to cached sessions; drop the oldest turn past ARGV[2]
+    APPEND_SCRIPT = """
+        if redis.call('RPUSHX', KEYS[1], ARGV[1]) == 0 then return 0 end
+        while redis.call('LLEN', KEYS[1]) > tonumber(ARGV[2]) + 1 do
+            redis.call('LPOP', KEYS[1])
+            redis.call('LSET', KEYS[1], 0, '')
+        end
+        redis.call('EXPIRE', KEYS[1], ARGV[3])
+        return 1
+    """
+
+    def __init__(self, client, ttl: float, turns: int):
+        self._redis = client
+        self._ttl = int(ttl)
+        self._turns = turns
+        self._append = client.register_script(self.APPEND_SCRIPT)
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.KEY_PREFIX}{session_id}"
+
+    async def get(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        raw = await self._redis.lrange(self._key(session_id), 0, -1)
+        if not raw:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [json.loads(r) for r in raw[1:]]
+
+    async def set(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        key = self._key(session_id)
+        turns = [json.dumps(_turn(m)) for m in messages[-self._turns:]]
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.rpush(key, "", *turns)
+            pipe.expire(key, self._ttl)
+            await pipe.execute()
+
+    async def append(self, session_id: str, message: Dict[str, Any]) -> None:
+        await self._append(
+            keys=[self._key(session_id)],
+            args=[json.dumps(_turn(message)), self._turns, self._ttl],
+        )
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+_cache = None
+
+
+def get_history_cache():
+    global _cache
+    if _cache is None:
+        if settings.REDIS_URL:
+            from redis.asyncio import Redis
+
+            _cache = RedisHistoryCache(
+                Redis.from_url(settings.REDIS_URL),
+                ttl=settings.CHAT_HISTORY_CACHE_TTL_SECONDS,
+                turns=settings.CHAT_HISTORY_TURNS,
+            )
+        else:
+            ttl = settings.CHAT_HISTORY_CACHE_TTL_SECONDS
+            if settings.WEB_CONCURRENCY > 1:
+                ttl = min(ttl, settings.CHAT_HISTORY_LOCAL_TTL_SECONDS)
+                logger.warning(
+                    f"{settings.WEB_CONCURRENCY} workers without REDIS_URL; "
+                    f"chat history is cached per worker for {ttl:g}s only"
+                )
+            _cache = InProcessHistoryCache(
+                settings.CHAT_HISTORY_CACHE_SIZE,
+                ttl=ttl,
+                turns=settings.CHAT_HISTORY_TURNS,
+            )
+    return _cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _cache
+    cache = get_history_cache()
+    logger.info(f"Chat history cache: {cache.stats()['backend']}")
+    yield
+    await cache.close()
+    _cache = None
@@ -0,0 +1,163 @@
+# backend/app/services/inference.py
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import FastAPI
+
+from ..core.config import settings
+from .nlp_service import extract_intents_and_entities
+from .recipe_embeddings import encode_texts
+
+logger = logging.getLogger("chef_ai.inference")
+
+
+def _intents(nlp, queries: List[str]) -> List[Tuple[str, Dict[str, List[str]]]]:
+    return extract_intents_and_entities(queries, nlp)
+
+
+class InferenceExecutor:
+    """
+    Runs spaCy/SBERT work on a worker thread pool so it never blocks the
+    event loop, and micro-batches concurrent `encode` and `intent` calls:
+    requests that arrive within `batch_window_ms` of each other (or while
+    the previous batch is still running) share a single SBERT forward pass
+    or spaCy nlp.pipe call.
+    """
+
+    def __init__(self, max_workers: int, batch_window_ms: float, max_batch_size: int):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._window = batch_window_ms / 1000
+        self._max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._batches = 0
+        self._encoded = 0
+        self._last_batch_size = 0
+        self._largest_batch_size = 0
+        self._intent_batches = 0
+        self._intents = 0
+
+    # — public API —
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Runs `fn(*args)` on the inference pool."""
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def encode(self, model, text: str) -> np.ndarray:
+        """Normalised float32 embedding of `text`, batched with concurrent callers."""
+        return await self._submit(encode_texts, model, text)
+
+    async def intent(self, nlp, query: str) -> Tuple[str, Dict[str, List[str]]]:
+        """Same as extract_intent_and_entities, batched with concurrent callers."""
+        return await self._submit(_intents, nlp, query)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "batches": self._batches,
+            "encoded": self._encoded,
+            "last_batch_size": self._last_batch_size,
+            "largest_batch_size": self._largest_batch_size,
+            "avg_batch_size": round(self._encoded / self._batches, 2) if self._batches else 0.0,
+            "intent_batches": self._intent_batches,
+            "intents": self._intents,
+            "avg_intent_batch_size": (
+                round(self._intents / self._intent_batches, 2) if self._intent_batches else 0.0
+            ),
+        }
+
+    async def shutdown(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+            self._batcher = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # — batching —
+
+    async def _submit(self, batch_fn: Callable, model, text: str) -> Any:
+        self._ensure_batcher()
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((batch_fn, model, text, fut))
+        return await fut
+
+    def _ensure_batcher(self):
+        if self._batcher is None or self._batcher.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def _collect(self) -> List[Tuple[Callable, Any, str, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self._window
+        while len(batch) < self._max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _batch_loop(self):
+        while True:
+            batch = await self._collect()
+            groups: Dict[Tuple[Callable, int], List[Tuple[Callable, Any, str, asyncio.Future]]] = {}
+            for item in batch:
+                groups.setdefault((item[0], id(item[1])), []).append(item)
+            for items in groups.values():
+                await self._run_batch(items)
+
+    async def _run_batch(self, items: List[Tuple[Callable, Any, str, asyncio.Future]]):
+        batch_fn, model = items[0][0], items[0][1]
+        texts = [text for _, _, text, _ in items]
+        try:
+            results = await self.run(batch_fn, model, texts)
+        except Exception as e:
+            logger.error(f"Batched {batch_fn.__name__} of {len(texts)} texts failed: {e}", exc_info=True)
+            for *_, fut in items:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        if batch_fn is encode_texts:
+            self._batches += 1
+            self._encoded += len(texts)
+            self._last_batch_size = len(texts)
+            self._largest_batch_size = max(self._largest_batch_size, len(texts))
+        else:
+            self._intent_batches += 1
+            self._intents += len(texts)
+        for (*_, fut), result in zip(items, results):
+            if not fut.done():
+                fut.set_result(result)
+
+
+_executor: Optional[InferenceExecutor] = None
+
+
+def get_inference_executor() -> InferenceExecutor:
+    global _executor
+    if _executor is None:
+        _executor = InferenceExecutor(
+            max_workers=settings.INFERENCE_WORKERS,
+            batch_window_ms=settings.INFERENCE_BATCH_WINDOW_MS,
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+        )
+    return _executor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _executor
+    executor = get_inference_executor()
+    yield
+    await executor.shutdown()
+    _executor = None
@@ -0,0 +1,21 @@
+# backend/app/services/llm_calls.py
+# Kept in sync by hand with nlp-service/app/services/llm_calls.py.
+# tests/test_shared_modules.py fails if they drift.
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+class LLMCallCounter(BaseCallbackHandler):
+    """Counts the LLM calls made by one chain run; pass it in the run's callbacks."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.calls = 0
+
+    def on_llm_start(self, serialized: Any, prompts: Any, **kwargs: Any) -> None:
+        self.calls += 1
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, **kwargs: Any) -> None:
+        self.calls += 1
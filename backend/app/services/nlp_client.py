@@ -0,0 +1,220 @@
+# backend/app/services/nlp_client.py
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import httpx
+from fastapi import FastAPI, HTTPException, status
+
+from ..core.config import settings
+
+logger = logging.getLogger("chef_ai.nlp_client")
+
+
+class NLPServiceClient:
+    """
+    Client for the nlp-service inference endpoints (INFERENCE_MODE=remote).
+    One pooled HTTP/2 connection set per process; concurrent `intent` calls
+    arriving within `batch_window_ms` of each other share one POST /intents.
+    Transport errors and upstream failures surface as 503s.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float,
+        stream_timeout: float,
+        max_connections: int,
+        batch_window_ms: float,
+        max_batch_size: int,
+    ):
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            http2=True,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self._stream_timeout = stream_timeout
+        self._window = batch_window_ms / 1000
+        self._max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._requests = 0
+        self._failures = 0
+        self._intent_batches = 0
+        self._intents = 0
+
+    # — public API —
+
+    async def intent(self, query: str) -> Tuple[str, Dict[str, List[str]]]:
+        """Same result as nlp_service.extract_intent_and_entities, computed remotely."""
+        self._ensure_batcher()
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((query, fut))
+        return await fut
+
+    async def rank(self, query: str, recipe_ids: List[int]) -> List[int]:
+        """`recipe_ids` ordered by similarity to `query`."""
+        if not recipe_ids:
+            return []
+        body = await self._post("/rank", {"query": query, "recipe_ids": recipe_ids})
+        return body["recipe_ids"]
+
+    async def rag(self, query: str, chat_history: List[Dict[str, str]], session_id: str) -> Dict[str, Any]:
+        """{"answer", "recipe_ids", "llm_calls"} for one RAG turn."""
+        return await self._post("/rag", self._rag_body(query, chat_history, session_id))
+
+    async def rag_stream(
+        self, query: str, chat_history: List[Dict[str, str]], session_id: str
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Relays the nlp-service RAG event stream as (event, data) pairs."""
+        self._requests += 1
+        try:
+            async with self._http.stream(
+                "POST", "/rag/stream",
+                json=self._rag_body(query, chat_history, session_id),
+                timeout=self._stream_timeout,
+            ) as r:
+                self._raise_for_status(r)
+                event, data = None, []
+                async for line in r.aiter_lines():
+                    if line.startswith("event:"):
+                        event = line[len("event:"):].strip()
+                    elif line.startswith("data:"):
+                        data.append(line[len("data:"):].strip())
+                    elif not line and event is not None:
+                        yield event, json.loads("\n".join(data) or "null")
+                        event, data = None, []
+        except httpx.HTTPError as e:
+            raise self._unavailable(e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self._requests,
+            "failures": self._failures,
+            "intent_batches": self._intent_batches,
+            "intents": self._intents,
+            "avg_intent_batch_size": (
+                round(self._intents / self._intent_batches, 2) if self._intent_batches else 0.0
+            ),
+        }
+
+    async def aclose(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+            self._batcher = None
+        await self._http.aclose()
+
+    # — HTTP —
+
+    @staticmethod
+    def _rag_body(query: str, chat_history: List[Dict[str, str]], session_id: str) -> Dict[str, Any]:
+        return {"query": query, "chat_history": chat_history, "session_id": session_id}
+
+    async def _post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        self._requests += 1
+        try:
+            r = await self._http.post(path, json=body)
+        except httpx.HTTPError as e:
+            raise self._unavailable(e)
+        self._raise_for_status(r)
+        return r.json()
+
+    def _raise_for_status(self, r: httpx.Response):
+        if r.status_code < 400:
+            return
+        self._failures += 1
+        logger.error(f"nlp-service {r.request.url.path} answered {r.status_code}")
+        headers = {"Retry-After": r.headers["Retry-After"]} if "Retry-After" in r.headers else None
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Inference service unavailable",
+            headers=headers,
+        )
+
+    def _unavailable(self, e: Exception) -> HTTPException:
+        self._failures += 1
+        logger.error(f"nlp-service request failed: {e!r}")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Inference service unavailable",
+        )
+
+    # — intent batching —
+
+    def _ensure_batcher(self):
+        if self._batcher is None or self._batcher.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self._window
+        while len(batch) < self._max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _batch_loop(self):
+        while True:
+            batch = await self._collect()
+            # Batches overlap on the wire; the loop goes straight back to collecting
+            task = asyncio.create_task(self._send_intents(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send_intents(self, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            body = await self._post("/intents", {"queries": [q for q, _ in batch]})
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        self._intent_batches += 1
+        self._intents += len(batch)
+        for (_, fut), result in zip(batch, body["results"]):
+            if not fut.done():
+                fut.set_result((result["intent"], result["entities"]))
+
+
+_client: Optional[NLPServiceClient] = None
+
+
+def get_nlp_client() -> NLPServiceClient:
+    global _client
+    if _client is None:
+        _client = NLPServiceClient(
+            base_url=settings.NLP_SERVICE_URL,
+            timeout=settings.NLP_SERVICE_TIMEOUT_SECONDS,
+            stream_timeout=settings.NLP_SERVICE_STREAM_TIMEOUT_SECONDS,
+            max_connections=settings.NLP_SERVICE_MAX_CONNECTIONS,
+            batch_window_ms=settings.INFERENCE_BATCH_WINDOW_MS,
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+        )
+    return _client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _client
+    client = get_nlp_client()
+    yield
+    await client.aclose()
+    _client = None
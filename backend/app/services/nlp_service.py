@@ -1,102 +1,217 @@
 # /home/marko/IdeaProjects/RAG/langchain-crash-course/chef_ai/backend/app/services/nlp_service.py
-import os
-import uuid
 from datetime import datetime
-from typing import List, Dict, Any, Tuple, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Dict, Any, Tuple, Optional
 import logging
 
-import spacy
-from sentence_transformers import SentenceTransformer, util
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
-from ..db.models import Recipe, RecipeIngredient, Ingredient, User
-from ..core import VectorStoreInitializationError  # Import from __init__.py
-
-# Optional RAG deps
-try:
-    from langchain_mistralai import ChatMistralAI
-    from langchain_core.documents import Document
-    from langchain.chains import create_history_aware_retriever, create_retrieval_chain
-    from langchain.chains.combine_documents import create_stuff_documents_chain
-    from langchain.prompts import ChatPromptTemplate
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    from langchain_chroma import Chroma
-    from langchain_mistralai import MistralAIEmbeddings
-    HAS_RAG_DEPS = True
-except ImportError:
-    HAS_RAG_DEPS = False
+from ..db.models import Recipe, RecipeIngredient
+from .recipe_embeddings import RecipeEmbeddingIndex, encode_texts, recipe_text
+from .recipe_filter import (
+    DEFAULT_MATCH_THRESHOLD, DEFAULT_MAX_PREP_TIME, DEFAULT_MIN_SERVINGS,
+    RecipeFilterIndex, normalize_ingredient,
+)
+
+if TYPE_CHECKING:
+    import spacy
 
 logger = logging.getLogger("chef_ai.nlp_service")
-print("HAS_RAG_DEPS =", HAS_RAG_DEPS)
 
 # — DB helpers —
 
-def get_recipes_from_db(db: Session) -> List[Dict[str, Any]]:
+def _recipe_to_dict(r: Recipe) -> Dict[str, Any]:
+    return {
+        "id": r.id,
+        "title": r.title,
+        "prep_time": r.prep_time,
+        "servings": r.servings,
+        "cooking_method": r.cooking_method,
+        "instructions": r.instructions,
+        "diet": r.diet,
+        "ingredients": [ri.ingredient.name for ri in r.recipe_ingredients],
+        "updated_at": r.updated_at,
+    }
+
+
+def get_recipes_from_db(db: Session, updated_since: Optional[datetime] = None) -> List[Dict[str, Any]]:
     logger.info("get_recipes_from_db called")
-    recipes = (
+    q = (
         db.query(Recipe)
         .options(joinedload(Recipe.recipe_ingredients)
                  .joinedload(RecipeIngredient.ingredient))
-        .all()
     )
+    if updated_since is not None:
+        q = q.filter(Recipe.updated_at >= updated_since)
+    recipes = q.all()
     logger.info(f"get_recipes_from_db returned {len(recipes)} recipes")
-    print("Recipes from DB:", recipes)  # 🔍 Inspect this in logs
+    return [_recipe_to_dict(r) for r in recipes]
+
+
+# SQL spelling of normalize_ingredient; ix_ingredients_normalized_name indexes it
+_NORMALIZED_NAME = "lower(btrim({col}, E' \\t\\n\\r\\f\\v'))"
+
+_CANDIDATES_SQL = """
+    WITH pantry AS (
+        SELECT DISTINCT {pantry_name} AS name
+          FROM pantry_items
+         WHERE user_id = :user_id
+    ),
+    matched AS (
+        SELECT ri.recipe_id, count(DISTINCT {ingredient_name}) AS matched
+          FROM pantry p
+          JOIN ingredients i ON {ingredient_name} = p.name
+          JOIN recipe_ingredients ri ON ri.ingredient_id = i.id
+      GROUP BY ri.recipe_id
+    )
+    SELECT r.id, r.title, r.prep_time, r.servings, r.cooking_method,
+           r.instructions, r.diet, r.updated_at, ing.names AS ingredients
+      FROM recipes r
+      {join} matched m ON m.recipe_id = r.id
+      CROSS JOIN LATERAL (
+          SELECT coalesce(array_agg(i.name), ARRAY[]::varchar[]) AS names,
+                 count(DISTINCT {ingredient_name}) AS total
+            FROM recipe_ingredients ri
+            JOIN ingredients i ON i.id = ri.ingredient_id
+           WHERE ri.recipe_id = r.id
+      ) ing
+     WHERE coalesce(m.matched, 0)::float / greatest(ing.total, 1) >= :threshold
+       AND coalesce(r.prep_time, 0) <= :max_prep_time
+       AND coalesce(r.servings, 0) >= :min_servings
+       AND (:diet = 'any' OR r.diet = :diet)
+       AND (:cooking_method = 'any' OR r.cooking_method = :cooking_method)
+  ORDER BY r.id
+"""
+
+
+def _candidate_query(user_id: int, prefs: Dict[str, Any]):
+    threshold = float(prefs.get("match_threshold", DEFAULT_MATCH_THRESHOLD))
+    sql = _CANDIDATES_SQL.format(
+        join="JOIN" if threshold > 0 else "LEFT JOIN",
+        pantry_name=_NORMALIZED_NAME.format(col="name"),
+        ingredient_name=_NORMALIZED_NAME.format(col="i.name"),
+    )
+    return text(sql), {
+        "user_id": user_id,
+        "threshold": threshold,
+        "max_prep_time": prefs.get("max_prep_time", DEFAULT_MAX_PREP_TIME),
+        "min_servings": prefs.get("min_servings", DEFAULT_MIN_SERVINGS),
+        "diet": prefs.get("dietary_preference", "any"),
+        "cooking_method": prefs.get("cooking_method", "any"),
+    }
+
+
+async def get_candidate_recipes_from_db_async(
+    db: AsyncSession, user_id: int, prefs: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    SQL counterpart of filter_recipes: computes the pantry overlap ratio and
+    applies the preference predicates in PostgreSQL, so only matching
+    recipes come back. With a positive threshold the scan starts from the
+    user's pantry and only touches recipes sharing an ingredient with it.
+    """
+    rows = (await db.execute(*_candidate_query(user_id, prefs))).mappings().all()
+    return [dict(r) for r in rows]
+
+
+_PROFILE_SQL = text("""
+    SELECT coalesce(s.preferences, '{}'::jsonb) AS preferences,
+           coalesce(s.allergies, '[]'::jsonb) AS allergies,
+           coalesce(s.dislikes, '[]'::jsonb) AS dislikes,
+           coalesce(p.names, ARRAY[]::varchar[]) AS pantry
+      FROM users u
+      LEFT JOIN user_settings s ON s.user_id = u.id
+      LEFT JOIN LATERAL (
+          SELECT array_agg(name ORDER BY id) AS names
+            FROM pantry_items
+           WHERE user_id = u.id
+      ) p ON true
+     WHERE u.id = :user_id
+""")
+
+
+def _profile(row) -> Dict[str, Any]:
+    if row is None:
+        return {"preferences": {}, "allergies": [], "dislikes": [], "pantry": []}
+    return dict(row)
+
+
+async def get_user_profile_from_db_async(db: AsyncSession, user_id: int) -> Dict[str, Any]:
+    """
+    Everything the chat modes need about a user — preferences, allergies,
+    dislikes and pantry item names — in a single query.
+    """
+    return _profile((await db.execute(_PROFILE_SQL, {"user_id": user_id})).mappings().first())
 
-    out: List[Dict[str, Any]] = []
-    for r in recipes:
-        ingredients = [ri.ingredient.name for ri in r.recipe_ingredients]
-        out.append({
-            "id": r.id,
-            "title": r.title,
-            "prep_time": r.prep_time,
-            "servings": r.servings,
-            "cooking_method": r.cooking_method,
-            "instructions": r.instructions,
-            "diet": r.diet,
-            "ingredients": ingredients,
-        })
-    return out
+# — Rule-based NLP —
 
+SPACY_MODEL_NAME = "en_core_web_sm"
+# Intent extraction only needs lemmas, POS tags and entities; the dependency
+# parser is the most expensive component and is never used.
+INTENT_PIPELINE_EXCLUDE = ("parser", "senter")
+INTENT_LEMMAS = {"cook", "make", "prepare", "recipe"}
 
-def get_user_profile_from_db(db: Session, user_id: int) -> Dict[str, Any]:
-    user = db.get(User, user_id)
-    if not user:
-        return {"preferences": {}, "pantry": []}
-    prefs = user.settings.preferences if user.settings else {}
-    pantry = [item.name for item in user.pantry_items]
-    return {"preferences": prefs, "pantry": pantry}
 
-# — Rule-based NLP —
+@lru_cache(maxsize=1)
+def load_intent_pipeline() -> "spacy.Language":
+    """Process-wide spaCy pipeline shared by NLPManager and intent extraction."""
+    import spacy
+
+    return spacy.load(SPACY_MODEL_NAME, exclude=list(INTENT_PIPELINE_EXCLUDE))
+
 
-def extract_intent_and_entities(query: str) -> Tuple[str, Dict[str, List[str]]]:
+def _intent_from_doc(doc) -> Tuple[str, Dict[str, List[str]]]:
     intent = "unknown"
-    entities: List[str] = []
-    keywords: List[str] = []
-    doc = spacy.blank("en")(query.lower()) if not spacy else spacy.load("en_core_web_sm")(query.lower())
     lemmas = {tok.lemma_ for tok in doc}
-    if lemmas & {"cook", "make", "prepare", "recipe"}:
+    if lemmas & INTENT_LEMMAS:
         intent = "suggest_dish"
     entities = [e.text for e in doc.ents]
     keywords = [tok.text for tok in doc if tok.pos_ in {"NOUN", "ADJ"}]
     return intent, {"entities": entities, "keywords": keywords}
 
+
+def extract_intent_and_entities(query: str, nlp=None) -> Tuple[str, Dict[str, List[str]]]:
+    nlp = nlp or load_intent_pipeline()
+    return _intent_from_doc(nlp(query.lower()))
+
+
+def extract_intents_and_entities(
+    queries: List[str], nlp=None, batch_size: int = 32
+) -> List[Tuple[str, Dict[str, List[str]]]]:
+    """Batch variant of extract_intent_and_entities built on nlp.pipe."""
+    nlp = nlp or load_intent_pipeline()
+    docs = nlp.pipe((q.lower() for q in queries), batch_size=batch_size)
+    return [_intent_from_doc(doc) for doc in docs]
+
+
 def filter_recipes(
     recipes: List[Dict[str, Any]],
     pantry: List[str],
-    prefs: Dict[str, Any]
+    prefs: Dict[str, Any],
+    index: Optional[RecipeFilterIndex] = None,
 ) -> List[Dict[str, Any]]:
+    """
+    Keeps recipes matching the pantry overlap threshold and the user's
+    preferences. `index` must be built over `recipes` (see CatalogSnapshot).
+    """
+    if index is not None:
+        return index.filter(pantry, prefs)
     out = []
-    threshold = prefs.get("match_threshold", 0.5)
+    threshold = prefs.get("match_threshold", DEFAULT_MATCH_THRESHOLD)
+    pantry_set = {normalize_ingredient(p) for p in pantry}
     for r in recipes:
-        ingr = set(r["ingredients"])
-        if len(ingr & set(pantry)) / max(len(ingr), 1) < threshold:
+        ingr = {normalize_ingredient(i) for i in r["ingredients"]}
+        if len(ingr & pantry_set) / max(len(ingr), 1) < threshold:
             continue
         dp = prefs.get("dietary_preference", "any")
         if dp != "any" and r.get("diet") != dp:
             continue
-        if r.get("prep_time", 0) > prefs.get("max_prep_time", 60):
+        if (r.get("prep_time") or 0) > prefs.get("max_prep_time", DEFAULT_MAX_PREP_TIME):
             continue
-        if r.get("servings", 0) < prefs.get("min_servings", 1):
+        if (r.get("servings") or 0) < prefs.get("min_servings", DEFAULT_MIN_SERVINGS):
             continue
         cm = prefs.get("cooking_method", "any")
         if cm != "any" and r.get("cooking_method") != cm:
@@ -104,18 +219,27 @@ def filter_recipes(
         out.append(r)
     return out
 
-def rank_recipes(query: str, recipes: List[Dict[str, Any]], model=None) -> List[Dict[str, Any]]:
+def rank_recipes(
+    query: str,
+    recipes: List[Dict[str, Any]],
+    model=None,
+    index: Optional[RecipeEmbeddingIndex] = None,
+    query_embedding: Optional[np.ndarray] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Orders recipes by cosine similarity to the query. With an `index` this is
+    one query encode plus one matrix-vector product over precomputed rows.
+    Pass `query_embedding` when the query was already encoded (e.g. batched).
+    """
     if not model or not recipes:
         return recipes
-    qemb = model.encode(query, convert_to_tensor=True)
-    scored = []
-    for r in recipes:
-        text = f"{r['title']}. {r['instructions']}"
-        remb = model.encode(text, convert_to_tensor=True)
-        score = util.cos_sim(qemb, remb).item()
-        scored.append((score, r))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [r for _, r in scored]
+    qemb = query_embedding if query_embedding is not None else encode_texts(model, [query])[0]
+    if index is not None:
+        scores = index.score(qemb, recipes, model)
+    else:
+        scores = encode_texts(model, [recipe_text(r) for r in recipes]) @ qemb
+    order = np.argsort(-scores, kind="stable")
+    return [recipes[i] for i in order]
 
 def personalize_response(query: str, recipes: List[Dict[str, Any]]) -> str:
     if not recipes:
@@ -123,62 +247,3 @@ def personalize_response(query: str, recipes: List[Dict[str, Any]]) -> str:
     if len(recipes) == 1:
         return f"I found the perfect recipe for you: {recipes[0]['title']}!"
     return f"I found {len(recipes)} recipes. Top recommendation is {recipes[0]['title']}!"
-
-# — RAG helpers —
-
-def build_vector_store(recipes: List[Dict[str, Any]]):
-    if not HAS_RAG_DEPS:
-        logger.warning("RAG dependencies are not met, cannot build vector store.")
-        return None
-    path = "./chroma_db"
-    try:
-        logger.info(f"Attempting to build or load Chroma vector store from: {path}")
-        if os.path.exists(path):
-            logger.info("Chroma directory exists, attempting to load.")
-            store = Chroma(persist_directory=path, embedding_function=MistralAIEmbeddings(model="mistral-embed"))
-            logger.info("Chroma vector store loaded successfully.")
-            return store
-        else:
-            logger.info("Chroma directory does not exist, creating a new one.")
-            logger.info(f"Number of recipes fetched from DB: {len(recipes)}")
-            print("Recipes received by build_vector_store:", recipes)  # Debugging
-            docs = [
-    Document(
-        page_content=f"{r['title']}. {r['instructions']}",
-        metadata={"id": r['id'], "diet": r.get('diet', 'any')}
-    )
-    for r in recipes
-]
-
-            logger.info(f"Number of LangChain documents created: {len(docs)}")
-            print("LangChain Documents:", docs)  # Debugging
-            splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=0)
-            chunks = splitter.split_documents(docs)
-            logger.info(f"Number of document chunks created: {len(chunks)}")
-            embeddings = MistralAIEmbeddings(model="mistral-embed")
-            logger.info("MistralAIEmbeddings initialized.")
-            if not chunks:
-                logger.warning("No document chunks to process. Vector store will be empty.")
-            store = Chroma.from_documents(chunks, embeddings, persist_directory=path)
-            logger.info("Chroma vector store created and persisted successfully.")
-            return store
-    except Exception as e:
-        logger.error(f"Error during Chroma vector store operation: {e}", exc_info=True)
-        raise VectorStoreInitializationError(f"Failed to initialize Chroma vector store: {e}")
-
-def create_rag_chain(llm, store, k: int = 4):
-    if not HAS_RAG_DEPS or not llm or not store:
-        logger.warning("Cannot create RAG chain. RAG dependencies not met or LLM/store is None.")
-        return None
-    retr = store.as_retriever(search_type="similarity", search_kwargs={"k": k})
-    ctx_prompt = ChatPromptTemplate.from_messages([
-        ("system", "You are a meal recommendation assistant. Reformulate the user's query."),
-        ("human", "{input}")
-    ])
-    har = create_history_aware_retriever(llm, retr, ctx_prompt)
-    qa_prompt = ChatPromptTemplate.from_messages([
-        ("system", "Based on context below, suggest recipes:\n{context}"),
-        ("human", "{input}")
-    ])
-    stuff = create_stuff_documents_chain(llm, qa_prompt)
-    return create_retrieval_chain(har, stuff)
@@ -0,0 +1,106 @@
+# backend/app/services/passwords.py
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, status
+from passlib.context import CryptContext
+
+from ..core.config import settings
+
+logger = logging.getLogger("chef_ai.passwords")
+
+# min/max pin the cost factor: hashes made with any other BCRYPT_ROUNDS
+# report needs_update and are re-hashed on the next successful login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool (bcrypt releases the GIL)
+    so hashing never blocks the event loop or starves the request
+    threadpool. At most `max_pending` operations may be queued or running;
+    callers that cannot get a slot within `wait_seconds` get a 503.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, wait_seconds: float):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._slots = asyncio.Semaphore(max_pending)
+        self._max_pending = max_pending
+        self._wait = wait_seconds
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new_hash); new_hash is set when `hashed` used another cost factor."""
+        return await self._run(pwd_context.verify_and_update, password, hashed)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._pending,
+            "max_pending": self._max_pending,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_ms": round(self._busy_seconds * 1000 / self._completed, 1) if self._completed else 0.0,
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self._wait)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            logger.warning(f"Password hashing saturated ({self._pending} pending); rejecting")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent logins; retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self._pending -= 1
+            self._completed += 1
+            self._busy_seconds += time.perf_counter() - started
+            self._slots.release()
+
+
+_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+    if _hasher is None:
+        _hasher = PasswordHasher(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+            wait_seconds=settings.PASSWORD_HASH_WAIT_SECONDS,
+        )
+    return _hasher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _hasher
+    hasher = get_password_hasher()
+    yield
+    hasher.shutdown()
+    _hasher = None
@@ -0,0 +1,336 @@
+# backend/app/services/rag.py
+# Kept in sync by hand with nlp-service/app/services/rag.py, which serves
+# INFERENCE_MODE=remote. tests/test_shared_modules.py fails if they drift.
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import logging
+
+from ..core import VectorStoreInitializationError
+from ..core.config import settings
+from .recipe_embeddings import content_hash, recipe_text
+
+# Optional RAG deps
+try:
+    from langchain_core.documents import Document
+    from langchain.chains.combine_documents import create_stuff_documents_chain
+    from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.runnables import RunnableLambda, RunnablePassthrough
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from langchain_chroma import Chroma
+    from .rag_embeddings import collection_name, get_rag_embeddings
+    HAS_RAG_DEPS = True
+except ImportError:
+    HAS_RAG_DEPS = False
+
+logger = logging.getLogger("chef_ai.rag")
+logger.info(f"HAS_RAG_DEPS = {HAS_RAG_DEPS}")
+
+# — RAG helpers —
+
+# One state file per Chroma collection (providers use separate collections)
+VECTOR_SYNC_STATE_FILE = "sync_state-{collection}.json"
+# Same trailing window as the recipe catalog's incremental refresh
+VECTOR_SYNC_WATERMARK_LAG = timedelta(seconds=60)
+_CHUNK_ID = re.compile(r"^recipe-(\d+)-\d+$")
+
+
+def _recipe_chunks(recipe: Dict[str, Any], splitter) -> Tuple[List[str], List["Document"]]:
+    """Chunks of one recipe with stable ids: recipe-<id>-<chunk no>."""
+    text = recipe_text(recipe)
+    doc = Document(
+        page_content=text,
+        metadata={"id": recipe["id"], "diet": recipe.get("diet", "any"), "content_hash": content_hash(text)},
+    )
+    chunks = splitter.split_documents([doc])
+    return [f"recipe-{recipe['id']}-{n}" for n in range(len(chunks))], chunks
+
+
+def _state_path() -> str:
+    return os.path.join(settings.CHROMA_PERSIST_DIR, VECTOR_SYNC_STATE_FILE.format(collection=collection_name()))
+
+
+def _read_sync_state() -> Dict[str, Any]:
+    try:
+        with open(_state_path()) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_sync_state(state: Dict[str, Any]) -> None:
+    path = _state_path()
+    try:
+        os.makedirs(settings.CHROMA_PERSIST_DIR, exist_ok=True)
+        with open(f"{path}.tmp", "w") as fh:
+            json.dump(state, fh)
+        os.replace(f"{path}.tmp", path)
+    except OSError as e:
+        logger.warning(f"Could not record vector store sync state in {path}: {e}")
+
+
+def _indexed_chunks(store, recipe_ids: List[Any]) -> Dict[Any, Tuple[Optional[str], List[str]]]:
+    """recipe id -> (indexed content hash, chunk ids), read for `recipe_ids` only."""
+    indexed: Dict[Any, Tuple[Optional[str], List[str]]] = {}
+    batch = settings.VECTOR_SYNC_BATCH_SIZE
+    for i in range(0, len(recipe_ids), batch):
+        found = store.get(where={"id": {"$in": recipe_ids[i:i + batch]}}, include=["metadatas"])
+        for chunk_id, meta in zip(found["ids"], found["metadatas"]):
+            meta = meta or {}
+            indexed.setdefault(meta.get("id"), (meta.get("content_hash"), []))[1].append(chunk_id)
+    return indexed
+
+
+def _indexed_recipe_ids(store) -> set:
+    """Recipe ids present in the collection, from chunk ids alone (no metadata or documents)."""
+    ids = set()
+    for chunk_id in store.get(include=[])["ids"]:
+        m = _CHUNK_ID.match(chunk_id)
+        if m:
+            ids.add(int(m.group(1)))
+    return ids
+
+
+def sync_vector_store(
+    store,
+    recipes: Sequence[Mapping[str, Any]],
+    watermark: Optional[datetime] = None,
+    changed_ids: Optional[Iterable[int]] = None,
+    removed_ids: Iterable[int] = (),
+) -> Dict[str, int]:
+    """
+    Brings the Chroma collection in line with `recipes`. Only recipes in
+    `changed_ids` are compared, by content hash against their indexed
+    chunks; edited ones are re-embedded in batches under stable ids and
+    chunks of `removed_ids` are deleted. With `changed_ids=None` every
+    recipe is compared and removals are found from the collection's ids.
+    Records the watermark in a per-collection state file.
+    """
+    by_id = {r["id"]: r for r in recipes}
+    if changed_ids is None:
+        candidates = list(by_id)
+        removed = sorted(_indexed_recipe_ids(store) - set(by_id))
+    else:
+        candidates = [rid for rid in changed_ids if rid in by_id]
+        removed = sorted(set(removed_ids) - set(by_id))
+    indexed = _indexed_chunks(store, candidates + removed)
+
+    hashes = {rid: content_hash(recipe_text(by_id[rid])) for rid in candidates}
+    stale = [
+        chunk_id
+        for rid, (h, chunk_ids) in indexed.items()
+        if hashes.get(rid) != h
+        for chunk_id in chunk_ids
+    ]
+    changed = [by_id[rid] for rid in candidates if indexed.get(rid, (None,))[0] != hashes[rid]]
+
+    batch = settings.VECTOR_SYNC_BATCH_SIZE
+    for i in range(0, len(stale), batch):
+        store.delete(ids=stale[i:i + batch])
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=0)
+    ids: List[str] = []
+    docs: List["Document"] = []
+    for r in changed:
+        chunk_ids, chunks = _recipe_chunks(r, splitter)
+        ids.extend(chunk_ids)
+        docs.extend(chunks)
+    for i in range(0, len(docs), batch):
+        store.add_documents(docs[i:i + batch], ids=ids[i:i + batch])
+
+    stats = {
+        "checked": len(candidates),
+        "embedded": len(changed),
+        "deleted_chunks": len(stale),
+        "recipes": len(by_id),
+    }
+    _write_sync_state({
+        **stats,
+        "watermark": watermark.isoformat() if watermark else None,
+        "synced_at": datetime.now(timezone.utc).isoformat(),
+    })
+    logger.info(f"Vector store sync: {stats}")
+    return stats
+
+
+def _changed_since_last_sync(recipes: Sequence[Mapping[str, Any]]) -> Optional[List[int]]:
+    """
+    Recipes updated since the watermark of this collection's last sync, or
+    None (compare everything) when there is no usable state.
+    """
+    recorded = _read_sync_state().get("watermark")
+    if not recorded:
+        return None
+    since = datetime.fromisoformat(recorded) - VECTOR_SYNC_WATERMARK_LAG
+    if any(r.get("updated_at") is None for r in recipes):
+        return None
+    return [r["id"] for r in recipes if r["updated_at"] >= since]
+
+
+def catch_up_vector_store(
+    store, recipes: Sequence[Mapping[str, Any]], watermark: Optional[datetime] = None
+) -> Dict[str, int]:
+    """
+    sync_vector_store for the recipes updated since this collection's last
+    recorded sync (all of them without a usable record), plus the recipes
+    deleted since then.
+    """
+    changed_ids = _changed_since_last_sync(recipes)
+    # Every indexed id; sync_vector_store skips the live ones
+    removed_ids = () if changed_ids is None else _indexed_recipe_ids(store)
+    return sync_vector_store(store, recipes, watermark, changed_ids, removed_ids)
+
+
+def build_vector_store(
+    recipes: List[Dict[str, Any]],
+    watermark: Optional[datetime] = None,
+    embeddings=None,
+):
+    """
+    Opens and syncs the Chroma store. `embeddings` defaults to the provider
+    chosen by RAG_EMBEDDING_PROVIDER (see get_rag_embeddings).
+    """
+    if not HAS_RAG_DEPS:
+        logger.warning("RAG dependencies are not met, cannot build vector store.")
+        return None
+    path = settings.CHROMA_PERSIST_DIR
+    try:
+        logger.info(f"Opening Chroma vector store at: {path}")
+        store = Chroma(
+            collection_name=collection_name(),
+            persist_directory=path,
+            embedding_function=embeddings or get_rag_embeddings(),
+        )
+        catch_up_vector_store(store, recipes, watermark)
+        return store
+    except Exception as e:
+        logger.error(f"Error during Chroma vector store operation: {e}", exc_info=True)
+        raise VectorStoreInitializationError(f"Failed to initialize Chroma vector store: {e}")
+
+# Words that only make sense against earlier turns ("make it vegan", "something else")
+REFERENCE_WORDS = {
+    "it", "its", "that", "this", "these", "those", "them", "they", "one", "ones",
+    "another", "else", "more", "instead", "same", "other", "again", "too", "also",
+    "previous", "last", "first", "second",
+}
+
+
+def needs_reformulation(query: str, chat_history: List[Dict[str, str]]) -> bool:
+    """
+    True when retrieval needs the query rewritten against the chat history:
+    there is history and the query is very short or refers back to it.
+    """
+    if not chat_history:
+        return False
+    words = re.findall(r"[a-z']+", query.lower())
+    return len(words) <= 3 or any(w in REFERENCE_WORDS for w in words)
+
+
+def _history_messages(chat_history: List[Dict[str, str]]) -> List[Tuple[str, str]]:
+    return [("human" if m["role"] == "user" else "ai", m["content"]) for m in chat_history]
+
+
+def _history_key(chat_history: List[Dict[str, str]]) -> str:
+    return hashlib.sha1(json.dumps(chat_history, sort_keys=True).encode()).hexdigest()
+
+
+def _recent_turns(chat_history: List[Dict[str, str]], turns: int) -> List[Dict[str, str]]:
+    """The last `turns` user/bot exchanges (two messages each)."""
+    return chat_history[-2 * turns:] if turns > 0 else []
+
+
+def _retrieval_step(llm, retriever, reformulation_cache=None, history_turns: int = 3):
+    """
+    Retrieval that only pays for the reformulation LLM call when
+    needs_reformulation says so; otherwise it searches with the raw query.
+    Reformulation sees only the last `history_turns` exchanges, and is
+    cached per (session, query, those exchanges), so the key stays bounded
+    however long the session runs.
+    """
+    ctx_prompt = ChatPromptTemplate.from_messages([
+        ("system", "You are a meal recommendation assistant. Reformulate the user's latest "
+                   "query as a standalone question using the conversation. Only return the question."),
+        MessagesPlaceholder("chat_history"),
+        ("human", "{input}")
+    ])
+    reformulate = ctx_prompt | llm | StrOutputParser()
+
+    async def retrieve(inputs: Dict[str, Any]):
+        query = inputs["input"]
+        history = inputs.get("chat_history") or []
+        if needs_reformulation(query, history):
+            recent = _recent_turns(history, history_turns)
+            key = (inputs.get("session_id"), query, _history_key(recent))
+            rewritten = reformulation_cache.get(key) if reformulation_cache is not None else None
+            if rewritten is None:
+                rewritten = await reformulate.ainvoke(
+                    {"input": query, "chat_history": _history_messages(recent)}
+                )
+                if reformulation_cache is not None:
+                    reformulation_cache.set(key, rewritten)
+            query = rewritten
+        return await retriever.ainvoke(query)
+
+    return RunnableLambda(retrieve).with_config(run_name="retrieve_documents")
+
+
+def _cached_answer_step(stuff, answer_cache, embed_query):
+    """
+    Answer step of the RAG chain behind a semantic cache. Only turns without
+    chat history are cached: retrieval then runs on the raw query (no
+    reformulation call), so a hit skips every LLM call. The cache scope is
+    the set of retrieved recipe ids, so an answer is only reused for the
+    same context.
+    """
+    async def answer(inputs: Dict[str, Any]):
+        key = None
+        if not inputs.get("chat_history"):
+            emb = await embed_query(inputs["input"])
+            doc_ids = frozenset(d.metadata.get("id") for d in inputs["context"])
+            cached = answer_cache.get(emb, doc_ids)
+            if cached is not None:
+                yield cached
+                return
+            key = (emb, doc_ids)
+        parts = []
+        async for token in stuff.astream(inputs):
+            parts.append(token)
+            yield token
+        if key is not None:
+            answer_cache.set(*key, "".join(parts))
+
+    return RunnableLambda(answer).with_config(run_name="cached_answer")
+
+
+def create_rag_chain(
+    llm, store, k: int = 4, answer_cache=None, embed_query=None, reformulation_cache=None,
+    history_turns: int = 3,
+):
+    """
+    Retrieval chain over `store`, invoked with `input`, `chat_history` and
+    optionally `session_id`; returns them plus `context` and `answer`.
+    Follow-up queries are reformulated against the last `history_turns`
+    exchanges before retrieval (see _retrieval_step). With `answer_cache` (a SemanticCache) and
+    `embed_query` (async, returns a normalised query embedding), answers to
+    standalone questions are served from the cache when a similar query
+    retrieved the same recipes.
+    """
+    if not HAS_RAG_DEPS or not llm or not store:
+        logger.warning("Cannot create RAG chain. RAG dependencies not met or LLM/store is None.")
+        return None
+    retr = store.as_retriever(search_type="similarity", search_kwargs={"k": k})
+    qa_prompt = ChatPromptTemplate.from_messages([
+        ("system", "Based on context below, suggest recipes:\n{context}"),
+        ("human", "{input}")
+    ])
+    stuff = create_stuff_documents_chain(llm, qa_prompt)
+    if answer_cache is not None and embed_query is not None:
+        stuff = _cached_answer_step(stuff, answer_cache, embed_query)
+    return (
+        RunnablePassthrough.assign(context=_retrieval_step(llm, retr, reformulation_cache, history_turns))
+        .assign(answer=stuff)
+        .with_config(run_name="retrieval_chain")
+    )
@@ -0,0 +1,209 @@
+# backend/app/services/recipe_catalog.py
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from fastapi import FastAPI
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.models import Recipe
+from ..db.session import SessionLocal
+from .nlp_service import get_recipes_from_db
+from .recipe_filter import RecipeFilterIndex
+
+logger = logging.getLogger("chef_ai.recipe_catalog")
+
+# A transaction that commits after a refresh can still carry an updated_at
+# just below the watermark, so every refresh re-reads this trailing window.
+WATERMARK_LAG = timedelta(seconds=60)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Read-only view of all recipes; replaced, never mutated."""
+    version: int
+    watermark: Optional[datetime]
+    recipes: Tuple[Mapping[str, Any], ...]
+    by_id: Mapping[int, Mapping[str, Any]]
+    filter_index: RecipeFilterIndex
+    # Relative to the previous snapshot; every id on the first load
+    changed_ids: FrozenSet[int] = frozenset()
+    removed_ids: FrozenSet[int] = frozenset()
+
+
+def _freeze(recipe: Dict[str, Any]) -> Mapping[str, Any]:
+    recipe = dict(recipe, ingredients=tuple(recipe["ingredients"]))
+    return MappingProxyType(recipe)
+
+
+def _same(a: Mapping[str, Any], b: Mapping[str, Any]) -> bool:
+    return all(a.get(k) == b.get(k) for k in b.keys() if k != "updated_at")
+
+
+class RecipeCatalog:
+    """
+    Process-wide recipe catalog. Loaded once, then refreshed incrementally
+    using the recipes.updated_at watermark; handlers only read snapshots.
+    """
+    _lock = threading.Lock()
+    _snapshot: Optional[CatalogSnapshot] = None
+    _listeners: List[Callable[[CatalogSnapshot], None]] = []
+    # Published snapshots not yet handed to the listeners, oldest first.
+    # Listeners run after _lock is released (a slow one, such as the vector
+    # store sync, must not block refreshes or first loads), one snapshot at
+    # a time and in version order, so no changed_ids are skipped.
+    _undelivered: List[CatalogSnapshot] = []
+    _notify_lock = threading.Lock()
+
+    @classmethod
+    def snapshot(cls, db: Optional[Session] = None) -> CatalogSnapshot:
+        snap = cls._snapshot
+        if snap is None:
+            snap = cls.load(db)
+        return snap
+
+    @classmethod
+    def subscribe(cls, listener: Callable[[CatalogSnapshot], None]) -> None:
+        """Registers a callback invoked with every new snapshot."""
+        if listener not in cls._listeners:
+            cls._listeners.append(listener)
+
+    @classmethod
+    def load(cls, db: Optional[Session] = None) -> CatalogSnapshot:
+        with cls._lock:
+            if cls._snapshot is None:
+                with _session(db) as s:
+                    recipes = get_recipes_from_db(s)
+                by_id = {r["id"]: _freeze(r) for r in recipes}
+                cls._publish(by_id, _max_watermark(recipes, None), frozenset(by_id), frozenset())
+            snapshot = cls._snapshot
+        cls._notify()
+        return snapshot
+
+    @classmethod
+    def refresh(cls, db: Optional[Session] = None) -> bool:
+        """
+        Pulls recipes changed since the watermark and drops deleted ones.
+        Returns True if a new snapshot was published.
+        """
+        if cls._snapshot is None:
+            cls.load(db)
+            return True
+        with cls._lock:
+            current = cls._snapshot
+            with _session(db) as s:
+                total, latest = s.query(func.count(Recipe.id), func.max(Recipe.updated_at)).one()
+                changed = []
+                if latest is not None and (current.watermark is None or latest > current.watermark - WATERMARK_LAG):
+                    since = current.watermark - WATERMARK_LAG if current.watermark else None
+                    changed = get_recipes_from_db(s, updated_since=since)
+
+                by_id = dict(current.by_id)
+                updated, removed = set(), set()
+                for r in changed:
+                    fresh = _freeze(r)
+                    old = by_id.get(r["id"])
+                    if old is None or not _same(old, fresh):
+                        by_id[r["id"]] = fresh
+                        updated.add(r["id"])
+                if len(by_id) != total:
+                    live = {rid for (rid,) in s.query(Recipe.id)}
+                    for rid in list(by_id):
+                        if rid not in live:
+                            del by_id[rid]
+                            removed.add(rid)
+
+            if not updated and not removed:
+                return False
+            cls._publish(
+                by_id, _max_watermark(changed, current.watermark), frozenset(updated), frozenset(removed)
+            )
+        cls._notify()
+        return True
+
+    @classmethod
+    def _publish(
+        cls,
+        by_id: Dict[int, Mapping[str, Any]],
+        watermark: Optional[datetime],
+        changed_ids: FrozenSet[int],
+        removed_ids: FrozenSet[int],
+    ) -> None:
+        """Swaps in a new snapshot; called with _lock held."""
+        version = cls._snapshot.version + 1 if cls._snapshot else 1
+        recipes = tuple(by_id[rid] for rid in sorted(by_id))
+        cls._snapshot = CatalogSnapshot(
+            version=version,
+            watermark=watermark,
+            recipes=recipes,
+            by_id=MappingProxyType(dict(by_id)),
+            filter_index=RecipeFilterIndex(recipes),
+            changed_ids=changed_ids,
+            removed_ids=removed_ids,
+        )
+        cls._undelivered.append(cls._snapshot)
+        logger.info(f"Recipe catalog v{version}: {len(recipes)} recipes, watermark {watermark}")
+
+    @classmethod
+    def _notify(cls) -> None:
+        """Hands undelivered snapshots to the listeners; called without _lock."""
+        with cls._notify_lock:
+            while True:
+                with cls._lock:
+                    if not cls._undelivered:
+                        return
+                    snapshot = cls._undelivered.pop(0)
+                for listener in cls._listeners:
+                    try:
+                        listener(snapshot)
+                    except Exception as e:
+                        logger.error(f"Recipe catalog listener failed: {e}", exc_info=True)
+
+
+def _max_watermark(recipes: List[Dict[str, Any]], current: Optional[datetime]) -> Optional[datetime]:
+    stamps = [r["updated_at"] for r in recipes if r.get("updated_at") is not None]
+    if current is not None:
+        stamps.append(current)
+    return max(stamps) if stamps else None
+
+
+@contextmanager
+def _session(db: Optional[Session]):
+    """Uses the caller's session if given, otherwise a short-lived one."""
+    if db is not None:
+        yield db
+        return
+    own = SessionLocal()
+    try:
+        yield own
+    finally:
+        own.close()
+
+
+async def _refresh_loop(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(RecipeCatalog.refresh)
+        except Exception as e:
+            logger.error(f"Recipe catalog refresh failed: {e}", exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await asyncio.to_thread(RecipeCatalog.load)
+    except Exception as e:
+        logger.error(f"Recipe catalog initial load failed: {e}", exc_info=True)
+    task = asyncio.create_task(_refresh_loop(settings.RECIPE_CATALOG_REFRESH_SECONDS))
+    try:
+        yield
+    finally:
+        task.cancel()
@@ -0,0 +1,335 @@
+# backend/app/services/recipe_embeddings.py
+# Kept in sync by hand with nlp-service/app/services/embeddings.py (each
+# service builds from its own directory and keeps its own index directory).
+# tests/test_shared_modules.py fails if they drift.
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger("chef_ai.recipe_embeddings")
+
+
+def recipe_text(recipe: Mapping[str, Any]) -> str:
+    """Text that gets embedded for a recipe (same as the RAG documents)."""
+    return f"{recipe['title']}. {recipe['instructions']}"
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: str, write) -> None:
+    """Writes via a temp file in the same directory, then renames over `path`."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as fh:
+            write(fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def encode_texts(model, texts: Sequence[str], batch_size: int = 64) -> np.ndarray:
+    """
+    Encodes texts into a contiguous float32 matrix of L2-normalised rows,
+    so cosine similarity becomes a plain dot product.
+    """
+    embs = model.encode(
+        list(texts),
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    return np.ascontiguousarray(embs, dtype=np.float32)
+
+
+class _IndexState:
+    """Immutable view of the index; replaced as a whole on every sync."""
+
+    __slots__ = ("ids", "hashes", "matrix", "rows")
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        hashes: List[str],
+        matrix: np.ndarray,
+        expected: Optional[Mapping[int, str]] = None,
+    ):
+        self.ids = ids
+        self.hashes = hashes
+        # Either an in-memory array or a read-only np.memmap of the saved file
+        self.matrix = matrix
+        # Rows whose content hash differs from `expected` (recipe edited
+        # since this version was written) are left out, i.e. scored as missing
+        self.rows: Dict[int, int] = {
+            int(rid): i for i, rid in enumerate(ids.tolist())
+            if expected is None or expected.get(rid) == hashes[i]
+        }
+
+
+class RecipeEmbeddingIndex:
+    """
+    Persistent, versioned embedding matrix of all recipes keyed by recipe id.
+
+    Rows are only re-encoded for recipes whose title/instructions changed
+    since the last sync. Readers never see a half-updated matrix because
+    every sync swaps in a new state object.
+
+    On disk, `path` is a directory holding one `matrix-v<version>.npy` per
+    version plus an `index.json` sidecar (model name, version, matrix file
+    name, recipe ids and content hashes). The matrix is opened with
+    mmap_mode="r", so every process on the host shares one page-cached copy
+    and a restart reuses it without re-encoding.
+
+    Only one process per directory writes: the indexer, which holds an
+    exclusive flock on `writer.lock` (taken by the first sync that finds it
+    free, kept until release() or exit). Every other process maps the
+    indexer's files read-only and re-opens them when the sidecar is replaced;
+    recipes edited since the mapped version are encoded on the fly meanwhile.
+    """
+
+    SIDECAR = "index.json"
+    WRITER_LOCK = "writer.lock"
+
+    def __init__(self, path: Optional[str], model_name: str):
+        self.path = path
+        self.model_name = model_name
+        self.version = 0
+        self._sync_lock = threading.Lock()
+        self._state = _IndexState(np.empty(0, dtype=np.int64), [], np.empty((0, 0), dtype=np.float32))
+        # Content hash per recipe id as of the last sync, for read-only processes
+        self._expected: Optional[Dict[int, str]] = None
+        # (inode, mtime) of the sidecar last loaded or written here
+        self._sidecar_stamp: Optional[tuple] = None
+        self._lock_file = None
+        self._lock_pid: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._state.ids)
+
+    # — persistence —
+
+    def _matrix_file(self, version: int) -> str:
+        return f"matrix-v{version}.npy"
+
+    def _sidecar_stat(self) -> Optional[tuple]:
+        try:
+            st = os.stat(os.path.join(self.path, self.SIDECAR))
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def is_indexer(self) -> bool:
+        """Whether this process writes the index, taking the writer lock if it is free."""
+        if not self.path or self._lock_pid == os.getpid():
+            return True
+        os.makedirs(self.path, exist_ok=True)
+        fh = open(os.path.join(self.path, self.WRITER_LOCK), "a")
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            return False
+        # A forked child has another pid, so it never inherits the role
+        self._lock_file, self._lock_pid = fh, os.getpid()
+        logger.info(f"Process {self._lock_pid} is the recipe embedding indexer for {self.path}")
+        return True
+
+    def release(self) -> None:
+        """Gives up the writer role, e.g. in a pre-fork master before it forks."""
+        if self._lock_file is not None and self._lock_pid == os.getpid():
+            self._lock_file.close()
+        self._lock_file = self._lock_pid = None
+
+    def refresh(self) -> bool:
+        """
+        Re-opens the index if the sidecar was replaced since it was last
+        loaded or written here. Costs one stat() otherwise.
+        """
+        if not self.path:
+            return False
+        stamp = self._sidecar_stat()
+        if stamp is None or stamp == self._sidecar_stamp:
+            return False
+        return self.load()
+
+    def load(self) -> bool:
+        if not self.path:
+            return False
+        sidecar = os.path.join(self.path, self.SIDECAR)
+        stamp = self._sidecar_stat()
+        if stamp is None:
+            return False
+        # Also on failure: refresh() retries once the sidecar is replaced
+        self._sidecar_stamp = stamp
+        try:
+            with open(sidecar, encoding="utf-8") as fh:
+                meta = json.load(fh)
+            if meta["model_name"] != self.model_name:
+                logger.info("Recipe embeddings on disk were built with another model; ignoring them.")
+                return False
+            ids = np.asarray(meta["ids"], dtype=np.int64)
+            hashes = list(meta["hashes"])
+            matrix = np.load(os.path.join(self.path, meta["matrix"]), mmap_mode="r", allow_pickle=False)
+            if matrix.dtype != np.float32 or matrix.ndim != 2 or matrix.shape[0] != len(ids):
+                raise ValueError(f"matrix {matrix.dtype}{matrix.shape} does not match {len(ids)} ids")
+            self.version = int(meta["version"])
+        except Exception as e:
+            logger.warning(f"Could not load recipe embeddings from {self.path}: {e}")
+            return False
+        self._state = _IndexState(ids, hashes, matrix, self._expected)
+        logger.info(f"Mapped {len(ids)} recipe embeddings (version {self.version}) from {self.path}")
+        return True
+
+    def save(self) -> Optional[np.ndarray]:
+        """
+        Writes the current state as a new version and returns it memory-mapped.
+        The matrix file is complete before the sidecar naming it replaces the
+        old one, so concurrent readers see either the old or the new version.
+        """
+        if not self.path:
+            return None
+        state, version = self._state, self.version
+        os.makedirs(self.path, exist_ok=True)
+        name = self._matrix_file(version)
+        target = os.path.join(self.path, name)
+        _write_atomic(target, lambda fh: np.save(fh, state.matrix, allow_pickle=False))
+        meta = {
+            "model_name": self.model_name,
+            "version": version,
+            "matrix": name,
+            "ids": state.ids.tolist(),
+            "hashes": state.hashes,
+        }
+        _write_atomic(
+            os.path.join(self.path, self.SIDECAR),
+            lambda fh: fh.write(json.dumps(meta).encode("utf-8")),
+        )
+        self._sidecar_stamp = self._sidecar_stat()
+        self._prune(keep={name, self._matrix_file(version - 1)})
+        return np.load(target, mmap_mode="r", allow_pickle=False)
+
+    def _prune(self, keep: set) -> None:
+        # The previous version stays for readers that picked up the old
+        # sidecar a moment ago; mappings of deleted files remain valid.
+        for entry in os.listdir(self.path):
+            if entry.startswith("matrix-v") and entry.endswith(".npy") and entry not in keep:
+                try:
+                    os.remove(os.path.join(self.path, entry))
+                except OSError:
+                    pass
+
+    # — maintenance —
+
+    def sync(self, recipes: Sequence[Mapping[str, Any]], model, batch_size: int = 64) -> bool:
+        """
+        Brings the matrix in line with `recipes`. In the indexer only new or
+        edited recipes are encoded and removed recipes are dropped; other
+        processes re-open the indexer's latest version instead. Returns True
+        if this process built a new matrix.
+        """
+        with self._sync_lock:
+            ids = np.fromiter((r["id"] for r in recipes), dtype=np.int64, count=len(recipes))
+            texts = [recipe_text(r) for r in recipes]
+            hashes = [content_hash(t) for t in texts]
+            if not self.is_indexer():
+                return self._follow(ids, hashes, texts, model, batch_size)
+
+            # Continue from the last version on disk, whoever wrote it
+            self.refresh()
+            matrix = self._rebuild(ids, hashes, texts, model, batch_size, f"v{self.version + 1}")
+            if matrix is None:
+                return False
+            self._state = _IndexState(ids, hashes, matrix)
+            self.version += 1
+            try:
+                mapped = self.save()
+            except OSError as e:
+                logger.warning(f"Could not persist recipe embeddings to {self.path}: {e}")
+            else:
+                if mapped is not None:
+                    # Serve from the shared page cache instead of this process's heap
+                    self._state = _IndexState(ids, hashes, mapped)
+            return True
+
+    def _follow(self, ids: np.ndarray, hashes: List[str], texts: List[str], model, batch_size: int) -> bool:
+        self._expected = dict(zip(ids.tolist(), hashes))
+        if self.refresh():
+            return False
+        state = self._state
+        if isinstance(state.matrix, np.memmap):
+            # Same version as before; only the set of edited recipes changed
+            self._state = _IndexState(state.ids, state.hashes, state.matrix, self._expected)
+            return False
+        # Nothing published yet: a private copy until the indexer's first save
+        matrix = self._rebuild(ids, hashes, texts, model, batch_size, "(local copy)")
+        if matrix is None:
+            return False
+        self._state = _IndexState(ids, hashes, matrix)
+        return True
+
+    def _rebuild(
+        self, ids: np.ndarray, hashes: List[str], texts: List[str], model, batch_size: int, label: str
+    ) -> Optional[np.ndarray]:
+        """The matrix for `ids`, reusing unchanged rows; None if nothing changed."""
+        old = self._state
+        keep_new, keep_old, encode_at = [], [], []
+        for i, (rid, h) in enumerate(zip(ids.tolist(), hashes)):
+            row = old.rows.get(rid)
+            if row is not None and old.hashes[row] == h:
+                keep_new.append(i)
+                keep_old.append(row)
+            else:
+                encode_at.append(i)
+
+        if not encode_at and len(ids) == len(old.ids):
+            return None
+
+        fresh = encode_texts(model, [texts[i] for i in encode_at], batch_size) if encode_at else None
+        dim = fresh.shape[1] if fresh is not None else old.matrix.shape[1]
+        matrix = np.empty((len(ids), dim), dtype=np.float32)
+        if keep_new:
+            matrix[keep_new] = old.matrix[keep_old]
+        if encode_at:
+            matrix[encode_at] = fresh
+        logger.info(
+            f"Recipe embeddings {label}: {len(encode_at)} encoded, "
+            f"{len(keep_new)} reused, {len(ids)} total"
+        )
+        return matrix
+
+    # — queries —
+
+    def score(self, query_emb: np.ndarray, recipes: Sequence[Mapping[str, Any]], model=None) -> np.ndarray:
+        """
+        Cosine similarity of `query_emb` against each recipe, in input order.
+        Recipes not yet in the index are encoded in one batch on the fly.
+        """
+        self.refresh()
+        state = self._state
+        rows = np.fromiter(
+            (state.rows.get(r["id"], -1) for r in recipes), dtype=np.int64, count=len(recipes)
+        )
+        scores = np.empty(len(recipes), dtype=np.float32)
+        hit = rows >= 0
+        if hit.any():
+            scores[hit] = state.matrix[rows[hit]] @ query_emb
+        if not hit.all():
+            missing = np.flatnonzero(~hit)
+            if model is None:
+                scores[missing] = -1.0
+            else:
+                embs = encode_texts(model, [recipe_text(recipes[i]) for i in missing])
+                scores[missing] = embs @ query_emb
+        return scores
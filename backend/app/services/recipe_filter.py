@@ -0,0 +1,88 @@
+# backend/app/services/recipe_filter.py
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+import numpy as np
+
+DEFAULT_MATCH_THRESHOLD = 0.5
+DEFAULT_MAX_PREP_TIME = 60
+DEFAULT_MIN_SERVINGS = 1
+
+
+def normalize_ingredient(name: str) -> str:
+    # Mirrored in SQL by nlp_service._NORMALIZED_NAME
+    return name.strip().lower()
+
+
+def _codes(values: Iterable[Any], vocab: Dict[Any, int]) -> np.ndarray:
+    return np.fromiter((vocab.setdefault(v, len(vocab)) for v in values), dtype=np.int32)
+
+
+class RecipeFilterIndex:
+    """
+    Inverted index from normalised ingredient to the rows of the recipes
+    using it, plus columnar copies of the filterable recipe attributes.
+
+    Pantry overlap is a sparse accumulation over the posting lists of the
+    pantry's ingredients; the preference predicates are numpy masks.
+    """
+
+    def __init__(self, recipes: Sequence[Mapping[str, Any]]):
+        self.recipes = recipes
+        n = len(recipes)
+        self.ingredient_ids: Dict[str, int] = {}
+        postings: List[List[int]] = []
+        self.ingredient_counts = np.zeros(n, dtype=np.int32)
+        for row, r in enumerate(recipes):
+            names = {normalize_ingredient(i) for i in r["ingredients"]}
+            self.ingredient_counts[row] = len(names)
+            for name in names:
+                iid = self.ingredient_ids.setdefault(name, len(postings))
+                if iid == len(postings):
+                    postings.append([])
+                postings[iid].append(row)
+        self.postings = [np.asarray(p, dtype=np.int32) for p in postings]
+
+        self.prep_time = np.fromiter((r.get("prep_time") or 0 for r in recipes), dtype=np.float64, count=n)
+        self.servings = np.fromiter((r.get("servings") or 0 for r in recipes), dtype=np.float64, count=n)
+        self._diets: Dict[Any, int] = {}
+        self._methods: Dict[Any, int] = {}
+        self.diet = _codes((r.get("diet") for r in recipes), self._diets)
+        self.cooking_method = _codes((r.get("cooking_method") for r in recipes), self._methods)
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def overlap(self, pantry: Iterable[str], dense: bool = False):
+        """
+        Returns (rows, matched_counts). Unless `dense`, only recipes sharing
+        at least one ingredient with the pantry are returned.
+        """
+        hits = {self.ingredient_ids.get(normalize_ingredient(p)) for p in pantry}
+        hits.discard(None)
+        touched = (
+            np.concatenate([self.postings[i] for i in hits])
+            if hits else np.empty(0, dtype=np.int32)
+        )
+        if dense:
+            counts = np.bincount(touched, minlength=len(self)).astype(np.int32)
+            return np.arange(len(self), dtype=np.int32), counts
+        rows, counts = np.unique(touched, return_counts=True)
+        return rows, counts
+
+    def filter(self, pantry: Iterable[str], prefs: Mapping[str, Any]) -> List[Mapping[str, Any]]:
+        threshold = prefs.get("match_threshold", DEFAULT_MATCH_THRESHOLD)
+        # With a non-positive threshold recipes without any overlap still qualify.
+        rows, counts = self.overlap(pantry, dense=threshold <= 0)
+        if not len(rows):
+            return []
+
+        mask = counts / np.maximum(self.ingredient_counts[rows], 1) >= threshold
+        mask &= self.prep_time[rows] <= prefs.get("max_prep_time", DEFAULT_MAX_PREP_TIME)
+        mask &= self.servings[rows] >= prefs.get("min_servings", DEFAULT_MIN_SERVINGS)
+        dp = prefs.get("dietary_preference", "any")
+        if dp != "any":
+            mask &= self.diet[rows] == self._diets.get(dp, -1)
+        cm = prefs.get("cooking_method", "any")
+        if cm != "any":
+            mask &= self.cooking_method[rows] == self._methods.get(cm, -1)
+        return [self.recipes[i] for i in rows[mask]]
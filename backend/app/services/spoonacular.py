@@ -1,47 +1,176 @@
 import asyncio
-from typing import List, Dict, Any
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Set, Tuple
 import httpx
+from fastapi import FastAPI
 from logging import getLogger
+from ..core.cache import TTLCache
 from ..core.config import settings
 
 logger = getLogger("uvicorn.error")
 API_KEY = settings.SPOONACULAR_API_KEY
-BASE = "https://api.spoonacular.com"
+# Point SPOONACULAR_BASE_URL at a local stub to run the online mode offline
+BASE = settings.SPOONACULAR_BASE_URL
+
+_client: Optional[httpx.AsyncClient] = None
+# Bounds concurrent upstream detail requests across all users
+_details_slots = asyncio.Semaphore(settings.SPOONACULAR_MAX_CONCURRENCY)
+# Recipe ids with an informationBulk request in flight (single-flight)
+_inflight: Dict[int, asyncio.Future] = {}
+# Running informationBulk tasks (referenced so they are not collected mid-flight)
+_bulk_fetches: Set[asyncio.Task] = set()
+# Pantry keys with a findByIngredients request in flight
+_inflight_searches: Dict[Tuple[Tuple[str, ...], int], asyncio.Future] = {}
+# findByIngredients results keyed on the normalised, sorted pantry
+_search_cache = TTLCache(settings.SPOONACULAR_CACHE_SIZE, settings.SPOONACULAR_SEARCH_TTL_SECONDS)
+# /recipes/{id}/information payloads keyed on recipe id
+_details_cache = TTLCache(settings.SPOONACULAR_CACHE_SIZE, settings.SPOONACULAR_DETAILS_TTL_SECONDS)
+
+
+def _new_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=BASE,
+        http2=True,
+        timeout=settings.SPOONACULAR_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.SPOONACULAR_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SPOONACULAR_MAX_CONNECTIONS,
+        ),
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _new_client()
+    return _client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _client
+    _client = _new_client()
+    yield
+    await _client.aclose()
+    _client = None
+
+
+def cache_stats() -> Dict[str, Any]:
+    return {"search": _search_cache.stats(), "details": _details_cache.stats()}
 
 
 async def fetch_recipe_details(recipe_id: int) -> Dict[str, Any]:
-    url = f"{BASE}/recipes/{recipe_id}/information"
-    params = {"apiKey": API_KEY, "includeNutrition": False}
-    async with httpx.AsyncClient() as client:
-        r = await client.get(url, params=params, timeout=10)
-        r.raise_for_status()
-        return r.json()
+    info = (await fetch_recipe_details_bulk([recipe_id]))[recipe_id]
+    if isinstance(info, BaseException):
+        raise info
+    return info
 
 
-async def fetch_recipes_online(ingredients: List[str], number: int = 5) -> List[Dict[str, Any]]:
-    if not API_KEY:
-        raise RuntimeError("Spoonacular API key not configured")
+async def _fetch_bulk(recipe_ids: List[int], futures: Dict[int, asyncio.Future]) -> None:
+    try:
+        params = {
+            "apiKey": API_KEY,
+            "ids": ",".join(str(rid) for rid in recipe_ids),
+            "includeNutrition": False,
+        }
+        async with _details_slots:
+            r = await get_client().get("/recipes/informationBulk", params=params)
+            r.raise_for_status()
+            infos = {info["id"]: info for info in r.json()}
+        for rid, fut in futures.items():
+            info = infos.get(rid)
+            if info is None:
+                fut.set_exception(LookupError(f"Recipe {rid} missing from informationBulk response"))
+            else:
+                _details_cache.set(rid, info)
+                fut.set_result(info)
+    except Exception as e:
+        for fut in futures.values():
+            if not fut.done():
+                fut.set_exception(e)
+    finally:
+        for rid, fut in futures.items():
+            if not fut.done():
+                fut.cancel()
+            _inflight.pop(rid, None)
+
 
-    url = f"{BASE}/recipes/findByIngredients"
+async def fetch_recipe_details_bulk(recipe_ids: List[int]) -> Dict[int, Any]:
+    """
+    Details for all `recipe_ids` in at most one informationBulk request.
+    Ids already being fetched for another caller are awaited instead of
+    re-requested. Failed ids map to the exception instead of a payload.
+    """
+    out: Dict[int, Any] = {}
+    pending: Dict[int, asyncio.Future] = {}
+    missing: List[int] = []
+    for rid in dict.fromkeys(recipe_ids):
+        cached = _details_cache.get(rid)
+        if cached is not None:
+            out[rid] = cached
+        elif rid in _inflight:
+            pending[rid] = _inflight[rid]
+        else:
+            missing.append(rid)
+
+    if missing:
+        loop = asyncio.get_running_loop()
+        owned = {rid: loop.create_future() for rid in missing}
+        _inflight.update(owned)
+        pending.update(owned)
+        # Own task, so cancelling the caller that started it leaves the
+        # fetch running for everyone else waiting on these ids
+        fetch = asyncio.ensure_future(_fetch_bulk(missing, owned))
+        _bulk_fetches.add(fetch)
+        fetch.add_done_callback(_bulk_fetches.discard)
+
+    # shield: a cancelled caller must not cancel a fetch other callers await
+    results = await asyncio.gather(
+        *(asyncio.shield(fut) for fut in pending.values()), return_exceptions=True
+    )
+    out.update(zip(pending.keys(), results))
+    return out
+
+
+def _pantry_key(ingredients: List[str], number: int) -> Tuple[Tuple[str, ...], int]:
+    return tuple(sorted({i.strip().lower() for i in ingredients})), number
+
+
+async def _search(key: Tuple[Tuple[str, ...], int]) -> List[Dict[str, Any]]:
     params = {
         "apiKey": API_KEY,
-        "ingredients": ",".join(ingredients),
-        "number": number,
+        "ingredients": ",".join(key[0]),
+        "number": key[1],
         "ranking": 1,
         "ignorePantry": True,
     }
+    resp = await get_client().get("/recipes/findByIngredients", params=params)
+    resp.raise_for_status()
+    hits = resp.json()
+    _search_cache.set(key, hits)
+    return hits
+
+
+async def fetch_recipes_online(ingredients: List[str], number: int = 5) -> List[Dict[str, Any]]:
+    if not API_KEY:
+        raise RuntimeError("Spoonacular API key not configured")
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, params=params, timeout=10)
-        resp.raise_for_status()
-        hits = resp.json()
+    key = _pantry_key(ingredients, number)
+    hits = _search_cache.get(key)
+    if hits is None:
+        search = _inflight_searches.get(key)
+        if search is None:
+            search = asyncio.ensure_future(_search(key))
+            _inflight_searches[key] = search
+            search.add_done_callback(lambda _: _inflight_searches.pop(key, None))
+        hits = await asyncio.shield(search)
 
-    tasks = [fetch_recipe_details(h["id"]) for h in hits]
-    details = await asyncio.gather(*tasks, return_exceptions=True)
+    details = await fetch_recipe_details_bulk([h["id"] for h in hits])
 
     out = []
-    for h, info in zip(hits, details):
-        if isinstance(info, Exception):
+    for h in hits:
+        info = details[h["id"]]
+        if isinstance(info, BaseException):
             logger.error(f"Error fetching details for {h['id']}: {info}")
             continue
 
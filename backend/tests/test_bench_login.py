@@ -0,0 +1,105 @@
+"""
+Benchmark: POST /users/login throughput and tail latency under concurrency,
+with an event-loop lag probe showing bcrypt stays off the loop.
+
+    RUN_BENCHMARKS=1 TEST_DATABASE_URL=... python -m pytest -s tests/test_bench_login.py
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.routers import users
+from app.services import passwords
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.postgres]
+
+USERS = 32
+LOGINS_PER_LEVEL = 32
+CONCURRENCY = (1, 8, 32)
+PASSWORD = "correct horse battery staple"
+
+
+@pytest.fixture(scope="module")
+def seeded(pg_engine):
+    hashed = passwords.pwd_context.hash(PASSWORD)
+    with pg_engine.begin() as conn:
+        conn.exec_driver_sql("TRUNCATE users CASCADE")
+        conn.exec_driver_sql(
+            "INSERT INTO users (username, email, hashed_password) VALUES (%s, %s, %s)",
+            [(f"bench{i}", f"bench{i}@example.com", hashed) for i in range(USERS)],
+        )
+    return [f"bench{i}" for i in range(USERS)]
+
+
+async def _loop_lag(stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append(time.perf_counter() - started - 0.01)
+
+
+async def _level(client: httpx.AsyncClient, usernames, concurrency: int):
+    latencies, statuses = [], []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def login(i: int):
+        async with gate:
+            started = time.perf_counter()
+            r = await client.post(
+                "/users/login", data={"username": usernames[i % len(usernames)], "password": PASSWORD}
+            )
+            latencies.append(time.perf_counter() - started)
+            statuses.append(r.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login(i) for i in range(LOGINS_PER_LEVEL)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "per_second": LOGINS_PER_LEVEL / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "rejected": statuses.count(503),
+        "failed": sum(1 for s in statuses if s not in (200, 503)),
+    }
+
+
+def test_bench_login(seeded, capsys):
+    app = FastAPI(lifespan=passwords.lifespan)
+    app.include_router(users.router)
+
+    async def run():
+        results = {}
+        stop, lag = asyncio.Event(), []
+        probe = asyncio.create_task(_loop_lag(stop, lag))
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for concurrency in CONCURRENCY:
+                    results[concurrency] = await _level(client, seeded, concurrency)
+        stop.set()
+        await probe
+        return results, max(lag)
+
+    results, max_lag = asyncio.run(run())
+    with capsys.disabled():
+        print(
+            f"\n[login] bcrypt rounds {settings.BCRYPT_ROUNDS}, "
+            f"{settings.PASSWORD_HASH_WORKERS} hash workers, {LOGINS_PER_LEVEL} logins per level"
+        )
+        for concurrency, r in results.items():
+            print(
+                f"  concurrency {concurrency:>3}: {r['per_second']:6.1f} logins/s, "
+                f"p50 {r['p50'] * 1000:7.1f} ms, p99 {r['p99'] * 1000:7.1f} ms, "
+                f"{r['rejected']} rejected"
+            )
+        print(f"  max event-loop lag: {max_lag * 1000:.1f} ms")
+
+    for r in results.values():
+        assert r["failed"] == 0
+    # Hashing runs on the bcrypt pool; one hash on the loop would stall it ~BCRYPT cost
+    assert max_lag < 0.1
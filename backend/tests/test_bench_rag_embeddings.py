@@ -0,0 +1,117 @@
+"""
+Benchmark: RAG index build time and retrieval latency with the local
+SentenceTransformer provider against the remote Mistral provider, the
+latter served by a local stub with a fixed per-request latency.
+
+    RUN_BENCHMARKS=1 python -m pytest -s tests/test_bench_rag_embeddings.py
+"""
+import hashlib
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+rag = pytest.importorskip("app.services.rag")
+if not rag.HAS_RAG_DEPS:
+    pytest.skip("LangChain/Chroma not installed", allow_module_level=True)
+
+from app.core.config import settings
+from app.services.rag_embeddings import get_rag_embeddings
+
+pytestmark = pytest.mark.benchmark
+
+RECIPES = 300
+QUERIES = 50
+STUB_LATENCY_SECONDS = 0.05  # one Mistral round-trip
+STUB_DIM = 1024
+
+
+class _MistralStub(BaseHTTPRequestHandler):
+    requests = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests += 1
+        time.sleep(STUB_LATENCY_SECONDS)
+        data = []
+        for i, text in enumerate(body["input"]):
+            seed = hashlib.sha256(text.encode()).digest()
+            data.append({"index": i, "embedding": [seed[j % 32] / 255 for j in range(STUB_DIM)]})
+        payload = json.dumps({"data": data}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def mistral_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MistralStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/v1/"
+    server.shutdown()
+
+
+def _recipes():
+    return [
+        {"id": i, "title": f"Recipe {i}", "instructions": f"Step one for dish {i}. Simmer and serve.", "diet": "any"}
+        for i in range(1, RECIPES + 1)
+    ]
+
+
+def _run(tmp_path, monkeypatch, provider, embeddings_factory):
+    monkeypatch.setattr(settings, "RAG_EMBEDDING_PROVIDER", provider)
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_DIR", str(tmp_path / "cache"))
+    results = {}
+    for label in ("cold build", "cached rebuild"):
+        monkeypatch.setattr(settings, "CHROMA_PERSIST_DIR", str(tmp_path / label.replace(" ", "_")))
+        started = time.perf_counter()
+        store = rag.build_vector_store(_recipes(), embeddings=embeddings_factory())
+        results[label] = time.perf_counter() - started
+    latencies = []
+    for q in range(QUERIES):
+        started = time.perf_counter()
+        store.similarity_search(f"what can I cook with dish {q}", k=4)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    results["retrieval p50"] = statistics.median(latencies)
+    results["retrieval p99"] = latencies[int(len(latencies) * 0.99) - 1]
+    return results
+
+
+def _report(capsys, provider, results):
+    with capsys.disabled():
+        print(f"\n[{provider}] {RECIPES} recipes, {QUERIES} queries")
+        for label, seconds in results.items():
+            print(f"  {label:>15}: {seconds * 1000:9.1f} ms")
+
+
+def test_bench_remote_provider(tmp_path, monkeypatch, capsys, mistral_stub):
+    monkeypatch.setattr(settings, "MISTRAL_EMBED_ENDPOINT", mistral_stub)
+    monkeypatch.setenv("MISTRAL_API_KEY", "stub")
+    monkeypatch.setenv("HF_HUB_OFFLINE", "1")  # tokenizer falls back to len()
+    results = _run(tmp_path, monkeypatch, "mistral", get_rag_embeddings)
+    _report(capsys, "mistral (stub)", results)
+    # Every query is one round-trip; the document cache spares the rebuild
+    assert results["retrieval p50"] >= STUB_LATENCY_SECONDS
+    assert results["cached rebuild"] < results["cold build"]
+
+
+def test_bench_local_provider(tmp_path, monkeypatch, capsys):
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    try:
+        sbert = sentence_transformers.SentenceTransformer("all-MiniLM-L6-v2")
+    except Exception as e:
+        pytest.skip(f"all-MiniLM-L6-v2 unavailable: {e}")
+    results = _run(
+        tmp_path, monkeypatch, "local", lambda: get_rag_embeddings(sbert, "all-MiniLM-L6-v2")
+    )
+    _report(capsys, "local SBERT", results)
+    assert results["retrieval p50"] < STUB_LATENCY_SECONDS
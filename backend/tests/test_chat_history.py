@@ -0,0 +1,86 @@
+import asyncio
+import datetime
+import os
+
+import pytest
+
+from app.services import firebase
+
+
+def _turn(session_id="s1", n=0):
+    return firebase.ChatTurn(
+        user_id=1,
+        session_id=session_id,
+        query=f"q{n}",
+        response=f"r{n}",
+        created_at=datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=n),
+    )
+
+
+@pytest.fixture
+def commits(monkeypatch):
+    state = {"failures": 0, "attempts": [], "committed": []}
+
+    def commit(db, turns):
+        state["attempts"].append([t.turn_id for t in turns])
+        if len(state["attempts"]) <= state["failures"]:
+            raise RuntimeError("DEADLINE_EXCEEDED")
+        state["committed"].extend(turns)
+
+    monkeypatch.setattr(firebase, "_commit_turns", commit)
+    return state
+
+
+def _write(turns, retries):
+    async def scenario():
+        writer = firebase.ChatHistoryWriter(
+            None, batch_size=10, flush_interval_ms=5, max_queue=10, retries=retries, backoff_ms=1
+        )
+        for t in turns:
+            writer.put(t)
+        await writer.close()
+
+    asyncio.run(scenario())
+
+
+def test_failed_batch_is_retried_with_the_same_turn_ids(commits):
+    commits["failures"] = 2
+    turns = [_turn(n=0), _turn(n=1)]
+    _write(turns, retries=3)
+    assert len(commits["attempts"]) == 3
+    assert all(a == commits["attempts"][0] for a in commits["attempts"])
+    assert commits["committed"] == turns
+
+
+def test_batch_is_dropped_after_the_last_retry(commits):
+    commits["failures"] = 10
+    _write([_turn()], retries=2)
+    assert len(commits["attempts"]) == 3
+    assert commits["committed"] == []
+
+
+@pytest.mark.skipif(
+    not os.environ.get("FIRESTORE_EMULATOR_HOST"), reason="set FIRESTORE_EMULATOR_HOST to run"
+)
+def test_legacy_array_is_merged_ahead_of_the_subcollection(monkeypatch):
+    gfs = pytest.importorskip("google.cloud.firestore")
+    pytest.importorskip("firebase_admin")
+
+    db = gfs.Client(project="chef-ai-test")
+    session_id = f"legacy-{os.getpid()}-{datetime.datetime.now().timestamp()}"
+    db.collection("chats").document(session_id).set({
+        "user_id": 1,
+        "messages": [{"query": f"old{i}", "response": f"old{i}"} for i in range(3)],
+    })
+    firebase._commit_turns(db, [_turn(session_id, n) for n in range(2)])
+    # A retried commit must not duplicate turns
+    turns = [_turn(session_id, n) for n in range(2, 4)]
+    firebase._commit_turns(db, turns)
+    firebase._commit_turns(db, turns)
+
+    monkeypatch.setattr(firebase, "_db", db)
+    client = firebase.get_firebase_client()
+    queries = [m["query"] for m in client._read_messages(session_id, limit=10)]
+    assert queries == ["old0", "old1", "old2", "q0", "q1", "q2", "q3"]
+    queries = [m["query"] for m in client._read_messages(session_id, limit=5)]
+    assert queries == ["old2", "q0", "q1", "q2", "q3"]
@@ -0,0 +1,75 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from langchain_core.documents import Document
+
+from app.dependencies import get_nlp_manager
+from app.routers.chat import rag
+from app.services.auth import get_current_active_user_async
+
+
+class FakeChain:
+    def __init__(self, fail_after_tokens: bool):
+        self.fail_after_tokens = fail_after_tokens
+
+    async def astream(self, inputs, config=None):
+        yield {"context": [Document(page_content="soup", metadata={"id": 7})]}
+        yield {"answer": "Try "}
+        yield {"answer": "the soup."}
+        if self.fail_after_tokens:
+            raise RuntimeError("LLM went away")
+
+
+class FakeFirebase:
+    def __init__(self):
+        self.saved = []
+
+    async def get_messages(self, session_id):
+        return []
+
+    async def save_chat_history(self, **turn):
+        self.saved.append(turn)
+
+
+class FakeUser:
+    id = 1
+
+
+@pytest.fixture
+def firebase(monkeypatch):
+    fake = FakeFirebase()
+    monkeypatch.setattr(rag, "get_firebase_client", lambda: fake)
+    return fake
+
+
+async def _stream(chain) -> str:
+    class Manager:
+        @staticmethod
+        def get_rag_chain():
+            return chain
+
+    app = FastAPI()
+    app.include_router(rag.router, prefix="/chat/rag")
+    app.dependency_overrides[get_nlp_manager] = lambda: Manager
+    app.dependency_overrides[get_current_active_user_async] = lambda: FakeUser()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.post("/chat/rag/stream", json={"query": "soup?", "session_id": "s1", "mode": "rag"})
+    assert r.status_code == 200
+    return r.text
+
+
+def test_completed_stream_is_saved(firebase):
+    body = asyncio.run(_stream(FakeChain(fail_after_tokens=False)))
+    assert "event: done" in body
+    assert firebase.saved == [
+        {"user_id": 1, "session_id": "s1", "query": "soup?", "response": "Try the soup."}
+    ]
+
+
+def test_errored_stream_is_not_saved(firebase):
+    body = asyncio.run(_stream(FakeChain(fail_after_tokens=True)))
+    assert "event: error" in body and "event: done" not in body
+    assert firebase.saved == []
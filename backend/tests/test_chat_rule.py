@@ -0,0 +1,17 @@
+import asyncio
+
+from app.routers.chat import rule
+from app.services import nlp_client
+
+
+class FakeClient:
+    async def rank(self, query, recipe_ids):
+        # Knows only some of the ids, e.g. recipes without ingredients
+        return [rid for rid in reversed(recipe_ids) if rid % 2 == 0]
+
+
+def test_remote_rank_keeps_ids_the_service_drops(monkeypatch):
+    monkeypatch.setattr(nlp_client, "get_nlp_client", lambda: FakeClient())
+    recipes = [{"id": rid} for rid in (1, 2, 3, 4, 5)]
+    ranked = asyncio.run(rule._rank("soup", recipes, None))
+    assert [r["id"] for r in ranked] == [4, 2, 1, 3, 5]
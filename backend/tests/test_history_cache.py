@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services import history_cache
+from app.services.history_cache import RedisHistoryCache
+
+
+def _turn(i):
+    return {"query": f"q{i}", "response": f"r{i}", "timestamp": f"t{i}", "extra": "dropped"}
+
+
+def _run(scenario):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis runs EVAL through it
+
+    async def go():
+        cache = RedisHistoryCache(fakeredis.FakeAsyncRedis(), ttl=60, turns=3)
+        try:
+            return await scenario(cache)
+        finally:
+            await cache.close()
+
+    return asyncio.run(go())
+
+
+def test_append_skips_uncached_sessions():
+    async def scenario(cache):
+        await cache.append("s", _turn(0))
+        return await cache.get("s")
+
+    assert _run(scenario) is None
+
+
+def test_append_keeps_the_last_turns_behind_the_marker():
+    async def scenario(cache):
+        await cache.set("s", [])
+        empty = await cache.get("s")
+        for i in range(5):
+            await cache.append("s", _turn(i))
+        raw = await cache._redis.lrange(cache._key("s"), 0, -1)
+        ttl = await cache._redis.ttl(cache._key("s"))
+        return empty, await cache.get("s"), raw[0], ttl
+
+    empty, turns, marker, ttl = _run(scenario)
+    assert empty == []
+    assert [t["query"] for t in turns] == ["q2", "q3", "q4"]
+    assert "extra" not in turns[0]
+    assert marker == b""
+    assert 0 < ttl <= 60
+
+
+def test_in_process_ttl_is_short_with_several_workers(monkeypatch):
+    monkeypatch.setattr(settings, "REDIS_URL", "")
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    monkeypatch.setattr(history_cache, "_cache", None)
+    assert history_cache.get_history_cache()._cache.ttl == settings.CHAT_HISTORY_LOCAL_TTL_SECONDS
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("torch", "sentence_transformers", "spacy", "langchain", "chromadb", "firebase_admin")
+# Every replica pays for these; imported first so app.main's cumulative
+# time below is the cost of the app's own import graph
+FRAMEWORKS = "fastapi, fastapi.security, sqlalchemy.orm, sqlalchemy.ext.asyncio, pydantic_settings"
+# The frameworks take about 0.4 s on a typical machine, so this keeps a
+# CRUD-only replica importable in well under a second
+APP_IMPORT_BUDGET_SECONDS = 0.5
+
+
+def _importtime(code):
+    """(cumulative seconds, module) for every import `python -X importtime` reports."""
+    env = {**os.environ, "ENABLE_CHAT": "false"}
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=BACKEND, env=env,
+        capture_output=True, text=True, timeout=60,
+    )
+    assert out.returncode == 0, out.stderr
+    rows = []
+    # import time: self [us] | cumulative | imported package
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            rows.append((int(cumulative) / 1e6, name.strip()))
+    return rows
+
+
+def _is_heavy(module):
+    top = module.split(".")[0]
+    # langchain also stands for its split packages (langchain_core, ...)
+    return any(top == h or top.startswith(h + "_") for h in HEAVY_MODULES)
+
+
+def test_app_imports_without_the_chat_stack():
+    rows = _importtime(f"import {FRAMEWORKS}; import app.main")
+    assert sorted({name for _, name in rows if _is_heavy(name)}) == []
+    app_main = {name: seconds for seconds, name in rows}["app.main"]
+    assert app_main < APP_IMPORT_BUDGET_SECONDS
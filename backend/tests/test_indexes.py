@@ -0,0 +1,121 @@
+"""
+EXPLAIN-based guards for the hot-path indexes (migrations 9d4f2c6e8a13 and
+e3a1f5c7b920, and init.sql). Runs on a seeded dataset big enough that PostgreSQL would pick
+a sequential scan for these lookups without the indexes.
+"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+pytestmark = pytest.mark.postgres
+
+USERS = 2000
+PANTRY_PER_USER = 25
+RECIPES = 20000
+INGREDIENTS = 20000
+
+
+@pytest.fixture(scope="module")
+def seeded(pg_engine):
+    with pg_engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO users (username, email, hashed_password)
+            SELECT 'u' || g, 'u' || g || '@example.com', 'x'
+              FROM generate_series(1, :users) g
+        """), {"users": USERS})
+        conn.execute(text("""
+            INSERT INTO pantry_items (user_id, category, name)
+            SELECT u.id, 'misc', 'Item ' || g
+              FROM users u, generate_series(1, :per_user) g
+        """), {"per_user": PANTRY_PER_USER})
+        conn.execute(text("""
+            INSERT INTO ingredients (name, category)
+            SELECT ' Ingredient ' || g, 'misc' FROM generate_series(1, :ingredients) g
+        """), {"ingredients": INGREDIENTS})
+        conn.execute(text("""
+            INSERT INTO recipes (title, instructions, prep_time, servings, cooking_method, diet)
+            SELECT 'Recipe ' || g, 'Cook it.', 5 + g % 120, 1 + g % 8,
+                   (ARRAY['bake', 'fry', 'boil', 'grill', 'raw'])[1 + g % 5],
+                   (ARRAY['any', 'vegan', 'vegetarian', 'keto', 'paleo', 'halal'])[1 + g % 6]
+              FROM generate_series(1, :recipes) g
+        """), {"recipes": RECIPES})
+        conn.execute(text("""
+            INSERT INTO recipe_ingredients (recipe_id, ingredient_id)
+            SELECT r.id, i.id
+              FROM recipes r
+              JOIN ingredients i ON i.id = 1 + r.id % (SELECT count(*) FROM ingredients)
+            ON CONFLICT DO NOTHING
+        """))
+        conn.execute(text("ANALYZE"))
+    return pg_engine
+
+
+def _plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _explain(engine, sql: str, params: dict):
+    with engine.connect() as conn:
+        (plan,) = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params).scalar()
+    return list(_plan_nodes(plan["Plan"]))
+
+
+def _assert_uses_index(nodes, table: str, index: str):
+    on_table = [n for n in nodes if n.get("Relation Name") == table]
+    assert on_table, f"{table} not in plan"
+    assert not any(n["Node Type"] == "Seq Scan" for n in on_table), on_table
+    # Bitmap heap scans name their index on the child Bitmap Index Scan node
+    assert any(n.get("Index Name") == index for n in nodes), nodes
+
+
+def test_pantry_lookup_by_lower_name_uses_unique_index(seeded):
+    # add_item / delete_item_by_name
+    nodes = _explain(
+        seeded,
+        "SELECT id FROM pantry_items WHERE user_id = :uid AND lower(name) = lower(:name)",
+        {"uid": 42, "name": "ITEM 7"},
+    )
+    _assert_uses_index(nodes, "pantry_items", "uq_pantry_items_user_id_lower_name")
+
+
+def test_pantry_listing_uses_user_id_prefix(seeded):
+    # list_items and the profile loader's pantry aggregate
+    nodes = _explain(seeded, "SELECT * FROM pantry_items WHERE user_id = :uid", {"uid": 42})
+    _assert_uses_index(nodes, "pantry_items", "uq_pantry_items_user_id_lower_name")
+
+
+def test_recipe_preference_filter_uses_composite_index(seeded):
+    nodes = _explain(
+        seeded,
+        "SELECT id FROM recipes WHERE diet = :diet AND cooking_method = :method AND prep_time <= :max",
+        {"diet": "keto", "method": "grill", "max": 20},
+    )
+    _assert_uses_index(nodes, "recipes", "ix_recipes_diet_cooking_method_prep_time")
+
+
+def test_recipes_by_ingredient_use_ingredient_id_index(seeded):
+    nodes = _explain(
+        seeded, "SELECT recipe_id FROM recipe_ingredients WHERE ingredient_id = :iid", {"iid": 3}
+    )
+    _assert_uses_index(nodes, "recipe_ingredients", "ix_recipe_ingredients_ingredient_id")
+
+
+def test_normalized_ingredient_lookup_uses_expression_index(seeded):
+    from app.services.nlp_service import _NORMALIZED_NAME
+
+    nodes = _explain(
+        seeded,
+        f"SELECT id FROM ingredients WHERE {_NORMALIZED_NAME.format(col='name')} = :name",
+        {"name": "ingredient 7"},
+    )
+    _assert_uses_index(nodes, "ingredients", "ix_ingredients_normalized_name")
+
+
+def test_case_insensitive_duplicate_pantry_item_is_rejected(seeded):
+    with pytest.raises(IntegrityError):
+        with seeded.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO pantry_items (user_id, category, name) VALUES (42, 'misc', 'ITEM 7')"
+            ))
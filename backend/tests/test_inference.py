@@ -0,0 +1,48 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services.inference import InferenceExecutor
+
+
+class Doc:
+    def __init__(self, text):
+        self._tokens = [SimpleNamespace(text=w, lemma_=w, pos_="NOUN") for w in text.split()]
+        self.ents = []
+
+    def __iter__(self):
+        return iter(self._tokens)
+
+
+class RecordingPipeline:
+    """Just enough of a spaCy Language for _intent_from_doc."""
+
+    def __init__(self):
+        self.pipe_calls = []
+
+    def pipe(self, texts, batch_size=32):
+        texts = list(texts)
+        self.pipe_calls.append(texts)
+        return [Doc(t) for t in texts]
+
+    def __call__(self, text):
+        raise AssertionError("intents must go through nlp.pipe")
+
+
+def test_concurrent_intents_share_one_pipe_call():
+    nlp = RecordingPipeline()
+
+    async def scenario():
+        executor = InferenceExecutor(max_workers=1, batch_window_ms=20, max_batch_size=16)
+        try:
+            queries = ["What can I cook", "Make a soup", "hello there"]
+            results = await asyncio.gather(*(executor.intent(nlp, q) for q in queries))
+            return results, executor.stats()
+        finally:
+            await executor.shutdown()
+
+    results, stats = asyncio.run(scenario())
+    assert nlp.pipe_calls == [["what can i cook", "make a soup", "hello there"]]
+    assert [intent for intent, _ in results] == ["suggest_dish", "suggest_dish", "unknown"]
+    assert results[2][1]["keywords"] == ["hello", "there"]
+    assert stats["intent_batches"] == 1 and stats["intents"] == 3
+    assert stats["batches"] == 0
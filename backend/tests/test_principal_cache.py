@@ -0,0 +1,132 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.db.query_count import count_queries
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, SessionLocal, async_engine
+from app.dependencies import get_nlp_manager
+from app.main import db_query_count
+from app.routers import users
+from app.routers.chat import rule
+from app.services.recipe_catalog import RecipeCatalog
+from app.services import auth
+from app.services.passwords import pwd_context
+
+pytestmark = pytest.mark.postgres
+
+PASSWORD = "old password"
+
+
+def _run(scenario):
+    async def go():
+        try:
+            return await scenario()
+        finally:
+            # Pooled asyncpg connections belong to this event loop
+            await async_engine.dispose()
+
+    return asyncio.run(go())
+
+
+@pytest.fixture
+def token(pg_engine):
+    with pg_engine.begin() as conn:
+        conn.exec_driver_sql("TRUNCATE users CASCADE")
+        conn.exec_driver_sql(
+            "INSERT INTO users (username, email, hashed_password, is_active) "
+            "VALUES ('alice', 'alice@example.com', %s, true)",
+            (pwd_context.hash(PASSWORD),),
+        )
+    auth.invalidate_principal("alice")
+    yield auth.create_access_token({"sub": "alice"})
+    auth.invalidate_principal("alice")
+
+
+def test_cached_principal_costs_no_query(token):
+    with SessionLocal() as db:
+        with count_queries() as first:
+            auth.get_current_active_user(auth.get_current_user(token, db))
+        with count_queries() as second:
+            user = auth.get_current_active_user(auth.get_current_user(token, db))
+            assert (user.username, user.email, user.is_active) == ("alice", "alice@example.com", True)
+    assert len(first) == 1
+    assert second == []
+
+
+def test_cached_principal_costs_no_query_async(token):
+    async def lookup():
+        async with AsyncSessionLocal() as db:
+            user = await auth.get_current_user_async(token, db)
+            return await auth.get_current_active_user_async(user)
+
+    async def scenario():
+        with count_queries() as first:
+            await lookup()
+        with count_queries() as second:
+            user = await lookup()
+        return first, second, user
+
+    first, second, user = _run(scenario)
+    assert len(first) == 1
+    assert second == []
+    assert user.id is not None
+
+
+def test_password_hash_is_not_cached(token):
+    with SessionLocal() as db:
+        auth.get_current_user(token, db)
+    assert "hashed_password" not in auth._principals.get("alice")
+
+
+def test_change_password_with_a_cached_principal(token):
+    app = FastAPI()
+    app.include_router(users.router)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/users/me", headers=headers)).status_code == 200
+            r = await client.put(
+                "/users/change-password", headers=headers,
+                json={"old_password": PASSWORD, "new_password": "new password"},
+            )
+            assert r.status_code == 204
+            r = await client.post("/users/login", data={"username": "alice", "password": "new password"})
+            assert r.status_code == 200
+
+    _run(scenario)
+
+
+@pytest.mark.parametrize("filter_in_db, per_request", [(True, 2), (False, 1)])
+def test_chat_rule_query_count(token, monkeypatch, filter_in_db, per_request):
+    # Principal (first request only), profile, and candidates unless they
+    # come from the in-memory catalog
+    async def intent(query, nlp_mgr):
+        return "suggest_dish", {}
+
+    monkeypatch.setattr(rule, "_intent", intent)
+    monkeypatch.setattr(settings, "RULE_FILTER_IN_DB", filter_in_db)
+    if not filter_in_db:
+        RecipeCatalog.snapshot()
+
+    app = FastAPI()
+    app.middleware("http")(db_query_count)
+    app.include_router(rule.router, prefix="/chat/rule")
+    app.dependency_overrides[get_nlp_manager] = lambda: None
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            counts = []
+            for _ in range(2):
+                r = await client.post("/chat/rule", headers=headers, json={"query": "Make a soup", "mode": "rule"})
+                assert r.status_code == 200
+                counts.append(int(r.headers["X-DB-Queries"]))
+            return counts
+
+    assert _run(scenario) == [per_request + 1, per_request]
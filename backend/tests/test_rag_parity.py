@@ -0,0 +1,167 @@
+"""
+The backend (INFERENCE_MODE=local) and the nlp-service (remote) must
+answer the same chat turn the same way. Each side runs in its own
+interpreter, since both packages are called `app`, with a scripted LLM:
+first over a scripted store, then over a Chroma store each side builds
+from the same recipe rows, twice, so the second pass hits the answer
+cache. Prompts, retriever queries, retrieved ids and answers are compared.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("langchain_chroma")
+pytest.importorskip("langchain_mistralai")
+
+ROOT = Path(__file__).resolve().parents[2]
+
+HISTORY = [
+    {"role": "user" if i % 2 == 0 else "bot", "content": f"message {i}"} for i in range(10)
+]
+CASES = [
+    {"input": "pasta with tomatoes and basil please", "chat_history": []},
+    {"input": "soup", "chat_history": []},
+    {"input": "make it vegan", "chat_history": HISTORY[:2]},
+    {"input": "something else", "chat_history": HISTORY},
+    {"input": "a quick chicken curry for four people tonight", "chat_history": HISTORY},
+]
+
+PROBE = """
+import asyncio, hashlib, json, sys, tempfile, zlib
+from datetime import datetime, timezone
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import RunnableLambda
+
+from app.core.semantic_cache import SemanticCache
+from app.services import rag
+
+cases, recipes = json.loads(sys.argv[1]), json.loads(sys.argv[2])
+for r in recipes:
+    r["updated_at"] = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+calls, queries = [], []
+
+def llm(prompt):
+    messages = prompt.to_messages()
+    calls.append([(m.type, m.content) for m in messages])
+    return "standalone: " + messages[-1].content
+
+def retrieve(query):
+    queries.append(query)
+    return [Document(page_content=query, metadata={"id": zlib.crc32(query.encode()) % 1000})]
+
+class Store:
+    def as_retriever(self, **kwargs):
+        return RunnableLambda(retrieve)
+
+class HashEmbeddings(Embeddings):
+    def _vec(self, text):
+        digest = hashlib.sha256(text.encode()).digest()
+        return [b / 255 for b in digest[:8]]
+
+    def embed_documents(self, texts):
+        return [self._vec(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vec(text)
+
+async def embed_query(text):
+    import numpy as np
+    vec = np.asarray(HashEmbeddings().embed_query(text), dtype=np.float32)
+    return vec / np.linalg.norm(vec)
+
+def run(chain):
+    out = []
+    for case in cases:
+        calls.clear(); queries.clear()
+        result = asyncio.run(chain.ainvoke(dict(case, session_id="s")))
+        reformulations = [c for c in calls if "standalone question" in c[0][1]]
+        out.append({
+            "llm_calls": len(calls),
+            "reformulation_prompts": reformulations,
+            "answer_prompts": [c for c in calls if c not in reformulations],
+            "retriever_queries": list(queries),
+            "recipe_ids": [d.metadata["id"] for d in result["context"]],
+            "answer": result["answer"],
+        })
+    return out
+
+scripted = run(rag.create_rag_chain(RunnableLambda(llm), Store(), history_turns=3))
+
+# The real path: Chroma store built and synced from recipe rows, answer cache on
+rag.settings.CHROMA_PERSIST_DIR = tempfile.mkdtemp()
+store = rag.build_vector_store(recipes, recipes[-1]["updated_at"], embeddings=HashEmbeddings())
+chain = rag.create_rag_chain(
+    RunnableLambda(llm), store, answer_cache=SemanticCache(16, 60, 0.99),
+    embed_query=embed_query, history_turns=3,
+)
+stored = store.get(include=["metadatas"])
+print(json.dumps({
+    "scripted": scripted,
+    "chunks": sorted(zip(stored["ids"], [m["id"] for m in stored["metadatas"]])),
+    "store": run(chain),
+    "cached": run(chain),
+}))
+"""
+
+RECIPES = [
+    {"id": i, "title": title, "instructions": "Cook it. " * (i * 40), "diet": "any"}
+    for i, title in enumerate(
+        ["Tomato basil pasta", "Chicken curry", "Vegan chili", "Mushroom soup", "Fried rice"], start=1
+    )
+]
+
+
+def _run(cwd: Path):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, json.dumps(CASES), json.dumps(RECIPES)],
+        cwd=cwd, capture_output=True, text=True, timeout=120,
+    )
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture(scope="module")
+def runs():
+    return _run(ROOT / "backend"), _run(ROOT / "nlp-service")
+
+
+def test_local_and_remote_retrieval_match(runs):
+    backend, remote = runs
+    assert remote["scripted"] == backend["scripted"]
+    # Sanity: the history-dependent cases were rewritten against the last 3 turns
+    assert [r["llm_calls"] for r in backend["scripted"]] == [1, 1, 2, 2, 1]
+    assert len(backend["scripted"][3]["reformulation_prompts"][0]) == 1 + 6 + 1
+
+
+def test_local_and_remote_answer_prompts_match(runs):
+    backend, remote = runs
+    assert [r["answer_prompts"] for r in remote["scripted"]] == [r["answer_prompts"] for r in backend["scripted"]]
+    # The scripted store returns the query itself as the only document
+    query = CASES[0]["input"]
+    assert backend["scripted"][0]["answer_prompts"] == [
+        [["system", f"Based on context below, suggest recipes:\n{query}"], ["human", query]]
+    ]
+
+
+def test_remote_store_is_built_from_recipe_rows_like_local(runs):
+    backend, remote = runs
+    # Stable chunk ids, several for the long recipes
+    assert remote["chunks"] == backend["chunks"]
+    assert {rid for _, rid in backend["chunks"]} == {r["id"] for r in RECIPES}
+    assert len(backend["chunks"]) > len(RECIPES)
+    assert remote["store"] == backend["store"]
+    assert all(r["recipe_ids"] for r in backend["store"])
+
+
+def test_remote_answer_cache_matches_local(runs):
+    backend, remote = runs
+    assert remote["cached"] == backend["cached"]
+    # Standalone questions are answered from the cache; follow-ups are not cached
+    assert [r["llm_calls"] for r in backend["cached"]] == [0, 0, 2, 2, 1]
+    assert [r["answer"] for r in backend["cached"]] == [r["answer"] for r in backend["store"]]
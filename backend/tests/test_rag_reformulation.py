@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+rag = pytest.importorskip("app.services.rag")
+if not rag.HAS_RAG_DEPS:
+    pytest.skip("LangChain not installed", allow_module_level=True)
+
+from langchain_core.runnables import RunnableLambda
+
+from app.core.cache import TTLCache
+
+
+def _history(turns: int, tag: str = ""):
+    out = []
+    for i in range(turns):
+        out.append({"role": "user", "content": f"question {tag}{i}"})
+        out.append({"role": "bot", "content": f"answer {tag}{i}"})
+    return out
+
+
+@pytest.fixture
+def step():
+    prompts = []
+
+    def llm(prompt_value):
+        prompts.append(prompt_value.to_messages())
+        return "standalone question"
+
+    cache = TTLCache(16, 60)
+    retrieve = rag._retrieval_step(
+        RunnableLambda(llm), RunnableLambda(lambda q: [q]), cache, history_turns=2
+    )
+    return retrieve, prompts
+
+
+def test_reformulation_sees_only_recent_turns(step):
+    retrieve, prompts = step
+    asyncio.run(retrieve.ainvoke({"input": "make it vegan", "chat_history": _history(5), "session_id": "s"}))
+    # system + 2 exchanges + the query
+    assert len(prompts[0]) == 1 + 4 + 1
+    assert "question 3" in prompts[0][1].content
+
+
+def test_cache_key_ignores_turns_outside_the_window(step):
+    retrieve, prompts = step
+    recent = _history(2, "recent ")
+    for older in (_history(1, "a "), _history(4, "b ")):
+        docs = asyncio.run(retrieve.ainvoke(
+            {"input": "make it vegan", "chat_history": older + recent, "session_id": "s"}
+        ))
+        assert docs == ["standalone question"]
+    assert len(prompts) == 1
+
+    asyncio.run(retrieve.ainvoke(
+        {"input": "make it vegan", "chat_history": recent + _history(1, "new "), "session_id": "s"}
+    ))
+    assert len(prompts) == 2
@@ -0,0 +1,119 @@
+import hashlib
+import os
+
+import numpy as np
+import pytest
+
+from app.services.recipe_embeddings import RecipeEmbeddingIndex, encode_texts
+
+
+class CountingModel:
+    """Deterministic unit vectors from a text hash; counts encoded texts."""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts, **kwargs):
+        self.encoded += len(texts)
+        vecs = np.array([list(hashlib.sha256(t.encode()).digest()[:8]) for t in texts], dtype=np.float32)
+        return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def _recipes(n, edited=()):
+    return [
+        {"id": i, "title": f"Recipe {i}", "instructions": "Cook it longer." if i in edited else "Cook it."}
+        for i in range(1, n + 1)
+    ]
+
+
+def _matrices(path):
+    return sorted(f for f in os.listdir(path) if f.startswith("matrix-v"))
+
+
+@pytest.fixture
+def indexes(tmp_path):
+    opened = []
+
+    def open_index():
+        index = RecipeEmbeddingIndex(str(tmp_path), "test-model")
+        opened.append(index)
+        return index
+
+    yield open_index
+    for index in opened:
+        index.release()
+
+
+def test_only_the_indexer_writes(indexes, tmp_path):
+    model = CountingModel()
+    writer, reader = indexes(), indexes()
+    assert writer.sync(_recipes(10), model)
+    assert not reader.sync(_recipes(10), model)
+    assert not reader.is_indexer()
+    # The reader maps the indexer's file instead of encoding its own copy
+    assert model.encoded == 10
+    assert reader._state.matrix.filename == writer._state.matrix.filename
+    assert _matrices(tmp_path) == ["matrix-v1.npy"]
+
+
+def test_reader_scores_edited_recipes_until_the_indexer_catches_up(indexes):
+    model = CountingModel()
+    writer, reader = indexes(), indexes()
+    writer.sync(_recipes(10), model)
+    reader.sync(_recipes(10), model)
+
+    edited = _recipes(10, edited={3})
+    reader.sync(edited, model)
+    query = encode_texts(model, ["soup"])[0]
+    model.encoded = 0
+    expected = encode_texts(model, [f"{r['title']}. {r['instructions']}" for r in edited]) @ query
+    model.encoded = 0
+    np.testing.assert_allclose(reader.score(query, edited, model), expected, rtol=1e-5)
+    assert model.encoded == 1
+
+    writer.sync(edited, model)
+    model.encoded = 0
+    np.testing.assert_allclose(reader.score(query, edited, model), expected, rtol=1e-5)
+    assert model.encoded == 0
+    assert reader.version == writer.version == 2
+
+
+def test_versions_continue_across_indexers(indexes, tmp_path):
+    model = CountingModel()
+    first, second = indexes(), indexes()
+    first.sync(_recipes(5), model)
+    first.sync(_recipes(6), model)
+    second.sync(_recipes(6), model)
+    first.release()
+
+    # The next process to sync takes over from the version on disk
+    assert second.sync(_recipes(7), model)
+    assert second.is_indexer()
+    assert second.version == 3
+    assert model.encoded == 7
+    assert _matrices(tmp_path) == ["matrix-v2.npy", "matrix-v3.npy"]
+
+
+def test_reader_encodes_locally_until_the_first_save(indexes):
+    model = CountingModel()
+    writer = indexes()
+    assert writer.is_indexer()
+    reader = indexes()
+    assert reader.sync(_recipes(4), model)
+    assert not isinstance(reader._state.matrix, np.memmap)
+
+    writer.sync(_recipes(4), model)
+    query = encode_texts(model, ["soup"])[0]
+    reader.score(query, _recipes(4), model)
+    assert isinstance(reader._state.matrix, np.memmap)
+
+
+def test_forked_worker_does_not_inherit_the_writer_role(indexes):
+    index = indexes()
+    index.sync(_recipes(3), CountingModel())
+    pid = os.fork()
+    if pid == 0:
+        os._exit(1 if index.is_indexer() else 0)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert index.is_indexer()
@@ -0,0 +1,147 @@
+import asyncio
+import random
+
+import pytest
+from sqlalchemy import text
+
+from app.services.nlp_service import filter_recipes, get_candidate_recipes_from_db_async, get_recipes_from_db
+from app.services.recipe_filter import RecipeFilterIndex
+
+RECIPES = [
+    {"id": 1, "ingredients": ["Tomato", "basil ", "pasta"], "diet": "vegetarian",
+     "prep_time": 20, "servings": 2, "cooking_method": "boil"},
+    {"id": 2, "ingredients": ["chicken", "rice"], "diet": "any",
+     "prep_time": 45, "servings": 4, "cooking_method": "fry"},
+    {"id": 3, "ingredients": ["peanut", "rice", "tofu", "chili"], "diet": "vegan",
+     "prep_time": 30, "servings": 2, "cooking_method": "fry"},
+    {"id": 4, "ingredients": [], "diet": "any", "prep_time": None, "servings": None, "cooking_method": None},
+]
+
+
+def _ids(recipes):
+    return [r["id"] for r in recipes]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return RecipeFilterIndex(RECIPES)
+
+
+def test_overlap_touches_only_recipes_sharing_an_ingredient(index):
+    rows, counts = index.overlap([" RICE", "tomato", "saffron"])
+    assert {RECIPES[r]["id"]: int(c) for r, c in zip(rows, counts)} == {1: 1, 2: 1, 3: 1}
+
+
+def test_pantry_threshold(index):
+    pantry = ["tomato", "Basil", "chicken", "rice"]
+    assert _ids(index.filter(pantry, {})) == [1, 2]
+    assert _ids(index.filter(pantry, {"match_threshold": 1.0})) == [2]
+    # Non-positive thresholds also admit recipes without any overlap
+    assert _ids(index.filter([], {"match_threshold": 0, "min_servings": 0})) == [1, 2, 3, 4]
+
+
+def test_diet_and_method(index):
+    pantry = ["peanut", "rice", "tofu", "chicken"]
+    assert _ids(index.filter(pantry, {"dietary_preference": "vegan"})) == [3]
+    assert _ids(index.filter(pantry, {"dietary_preference": "keto"})) == []
+    assert _ids(index.filter(pantry, {"cooking_method": "fry", "min_servings": 3})) == [2]
+
+
+def test_allergies_do_not_narrow_the_candidates(index):
+    # Allergies live next to the preferences in the profile; the filters
+    # leave them to the caller on every path (index, loop and SQL)
+    pantry = ["peanut", "rice", "tofu", "chicken"]
+    prefs = {"allergies": ["peanut"]}
+    assert _ids(index.filter(pantry, prefs)) == _ids(filter_recipes(RECIPES, pantry, prefs)) == [2, 3]
+
+
+def _random_catalog(rng, n=300):
+    names = [f"ing{i}" for i in range(40)]
+    return [
+        {
+            "id": i,
+            "ingredients": [rng.choice(["", " ", "\t"]) + rng.choice([n, n.upper()]) + rng.choice(["", " "])
+                            for n in rng.sample(names, rng.randint(0, 6))],
+            "diet": rng.choice(["any", "vegan", "vegetarian"]),
+            "prep_time": rng.choice([None, 10, 30, 60, 90]),
+            "servings": rng.choice([None, 1, 2, 4]),
+            "cooking_method": rng.choice(["any", "bake", "fry"]),
+        }
+        for i in range(n)
+    ], names
+
+
+def test_index_matches_the_per_recipe_filter():
+    rng = random.Random(4)
+    recipes, names = _random_catalog(rng)
+    index = RecipeFilterIndex(recipes)
+    for _ in range(200):
+        pantry = [f" {n.title()} " for n in rng.sample(names, rng.randint(0, 12))]
+        prefs = {
+            "match_threshold": rng.choice([0, 0.25, 0.5, 1.0]),
+            "dietary_preference": rng.choice(["any", "vegan", "keto"]),
+            "max_prep_time": rng.choice([30, 60, 120]),
+            "min_servings": rng.choice([1, 2, 3]),
+            "cooking_method": rng.choice(["any", "fry"]),
+            "allergies": rng.sample(names, 2),
+        }
+        assert _ids(index.filter(pantry, prefs)) == _ids(filter_recipes(recipes, pantry, prefs))
+
+
+@pytest.fixture
+def untrimmed_catalog(pg_engine):
+    """Ingredient and pantry names with stray case and whitespace on both sides."""
+    with pg_engine.begin() as conn:
+        conn.exec_driver_sql("TRUNCATE users, recipes, ingredients CASCADE")
+        conn.exec_driver_sql(
+            "INSERT INTO users (id, username, email, hashed_password) VALUES (1, 'cook', 'cook@example.com', 'x')"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO ingredients (id, name) VALUES "
+            "(1, ' Tomato'), (2, 'basil '), (3, 'pasta'), (4, E'Rice\\t'), (5, 'chicken'), (6, 'tofu')"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO recipes (id, title, instructions, prep_time, servings, cooking_method, diet) VALUES "
+            "(1, 'a', 'x', 20, 2, 'boil', 'vegetarian'), (2, 'b', 'x', 45, 4, 'fry', 'any'), "
+            "(3, 'c', 'x', 30, 2, 'fry', 'vegan'), (4, 'd', 'x', 10, 1, 'bake', 'any')"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO recipe_ingredients (recipe_id, ingredient_id) VALUES "
+            "(1, 1), (1, 2), (1, 3), (2, 4), (2, 5), (3, 4), (3, 6)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO pantry_items (user_id, category, name) VALUES "
+            "(1, 'veg', 'tomato '), (1, 'herb', ' BASIL'), (1, 'grain', 'rice'), (1, 'meat', 'Chicken')"
+        )
+    return 1
+
+
+@pytest.mark.postgres
+def test_sql_candidates_match_the_python_filters(untrimmed_catalog):
+    from app.db.session import AsyncSessionLocal, SessionLocal, async_engine
+
+    with SessionLocal() as db:
+        recipes = sorted(get_recipes_from_db(db), key=lambda r: r["id"])
+        pantry = list(db.execute(text("SELECT name FROM pantry_items WHERE user_id = 1")).scalars())
+    index = RecipeFilterIndex(recipes)
+
+    async def sql(prefs):
+        try:
+            async with AsyncSessionLocal() as db:
+                return await get_candidate_recipes_from_db_async(db, untrimmed_catalog, prefs)
+        finally:
+            await async_engine.dispose()
+
+    for prefs in (
+        {},
+        {"match_threshold": 1.0},
+        {"match_threshold": 0},
+        {"dietary_preference": "vegan", "match_threshold": 0.5},
+        {"cooking_method": "fry", "min_servings": 3},
+        {"allergies": ["tomato"]},
+    ):
+        expected = _ids(filter_recipes(recipes, pantry, prefs))
+        assert _ids(index.filter(pantry, prefs)) == expected, prefs
+        assert _ids(asyncio.run(sql(prefs))) == expected, prefs
+    # Untrimmed names on both sides still match (tomato, basil; rice)
+    assert _ids(filter_recipes(recipes, pantry, {})) == [1, 2, 3]
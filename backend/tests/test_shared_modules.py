@@ -0,0 +1,30 @@
+import re
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+# Hand-synced copies: each service builds from its own directory
+SHARED = [
+    ("app/services/recipe_embeddings.py", "app/services/embeddings.py"),
+    ("app/services/rag.py", "app/services/rag.py"),
+    ("app/services/rag_embeddings.py", "app/services/rag_embeddings.py"),
+    ("app/services/llm_calls.py", "app/services/llm_calls.py"),
+    ("app/core/cache.py", "app/core/cache.py"),
+    ("app/core/semantic_cache.py", "app/core/semantic_cache.py"),
+]
+
+
+def _code(path: Path) -> str:
+    """Module body without the leading comments, the logger name and app import paths."""
+    text = re.sub(r"\A(#.*\n)+", "", path.read_text())
+    text = re.sub(r'logging\.getLogger\("[^"]+"\)', "logging.getLogger(...)", text)
+    # Relative in the backend, absolute in the nlp-service
+    return re.sub(r"from (?:\.+|app\.)[\w.]* import", "from app import", text)
+
+
+@pytest.mark.parametrize("backend, nlp_service", SHARED)
+def test_shared_modules_match(backend, nlp_service):
+    assert _code(ROOT / "backend" / backend) == _code(ROOT / "nlp-service" / nlp_service), (
+        f"backend/{backend} and nlp-service/{nlp_service} have drifted"
+    )
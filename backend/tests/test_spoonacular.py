@@ -0,0 +1,57 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import spoonacular
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Stub informationBulk that blocks until `release` is set and counts calls."""
+    state = {"calls": 0, "release": asyncio.Event()}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state["calls"] += 1
+        await state["release"].wait()
+        ids = [int(i) for i in request.url.params["ids"].split(",")]
+        return httpx.Response(200, json=[{"id": i, "title": f"r{i}"} for i in ids])
+
+    monkeypatch.setattr(
+        spoonacular, "_client",
+        httpx.AsyncClient(base_url="http://spoonacular.test", transport=httpx.MockTransport(handler)),
+    )
+    spoonacular._details_cache.clear()
+    yield state
+    spoonacular._details_cache.clear()
+
+
+def test_cancelled_initiator_does_not_fail_other_waiters(upstream):
+    async def scenario():
+        upstream["release"] = asyncio.Event()
+        first = asyncio.create_task(spoonacular.fetch_recipe_details_bulk([1, 2]))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(spoonacular.fetch_recipe_details_bulk([1, 2]))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        upstream["release"].set()
+        return await second
+
+    out = asyncio.run(scenario())
+    assert upstream["calls"] == 1
+    assert out == {1: {"id": 1, "title": "r1"}, 2: {"id": 2, "title": "r2"}}
+    assert not spoonacular._inflight
+
+
+def test_concurrent_callers_share_one_request(upstream):
+    async def scenario():
+        upstream["release"] = asyncio.Event()
+        tasks = [asyncio.create_task(spoonacular.fetch_recipe_details_bulk([1, 2, 3])) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        upstream["release"].set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(scenario())
+    assert upstream["calls"] == 1
+    assert all(set(r) == {1, 2, 3} for r in results)
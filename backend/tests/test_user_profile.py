@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from app.db.query_count import count_queries
+from app.db.session import AsyncSessionLocal, async_engine
+from app.services.nlp_service import get_user_profile_from_db_async
+
+pytestmark = pytest.mark.postgres
+
+
+@pytest.fixture
+def user_id(pg_engine):
+    with pg_engine.begin() as conn:
+        conn.exec_driver_sql("TRUNCATE users CASCADE")
+        uid = conn.exec_driver_sql(
+            "INSERT INTO users (username, email, hashed_password, is_active) "
+            "VALUES ('bob', 'bob@example.com', 'x', true) RETURNING id"
+        ).scalar_one()
+        conn.exec_driver_sql(
+            "INSERT INTO user_settings (user_id, preferences, allergies, dislikes) "
+            "VALUES (%s, '{\"diet\": \"vegan\"}', '[\"peanut\"]', '[\"okra\"]')",
+            (uid,),
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO pantry_items (user_id, category, name) "
+            "VALUES (%s, 'veg', 'tomato'), (%s, 'grain', 'rice')",
+            (uid, uid),
+        )
+    return uid
+
+
+def _profile(user_id):
+    async def go():
+        try:
+            async with AsyncSessionLocal() as db:
+                with count_queries() as queries:
+                    profile = await get_user_profile_from_db_async(db, user_id)
+            return profile, queries
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(go())
+
+
+def test_profile_is_one_statement(user_id):
+    profile, queries = _profile(user_id)
+    assert len(queries) == 1
+    assert profile == {
+        "preferences": {"diet": "vegan"},
+        "allergies": ["peanut"],
+        "dislikes": ["okra"],
+        "pantry": ["tomato", "rice"],
+    }
+
+
+def test_profile_without_settings_or_pantry(user_id, pg_engine):
+    with pg_engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM user_settings")
+        conn.exec_driver_sql("DELETE FROM pantry_items")
+    profile, queries = _profile(user_id)
+    assert len(queries) == 1
+    assert profile == {"preferences": {}, "allergies": [], "dislikes": [], "pantry": []}
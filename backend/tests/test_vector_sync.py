@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta, timezone
+import hashlib
+import os
+
+import pytest
+from sqlalchemy import text
+
+rag = pytest.importorskip("app.services.rag")
+if not rag.HAS_RAG_DEPS:
+    pytest.skip("LangChain/Chroma not installed", allow_module_level=True)
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import settings
+from app.services.rag_embeddings import collection_name
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic 8-d vectors from a text hash; counts embedded documents."""
+
+    def __init__(self):
+        self.embedded = 0
+
+    def _vec(self, text):
+        digest = hashlib.sha256(text.encode()).digest()
+        return [b / 255 for b in digest[:8]]
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return [self._vec(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vec(text)
+
+
+def _recipe(rid, title=None, updated_at=T0):
+    return {"id": rid, "title": title or f"Recipe {rid}", "instructions": "Cook it.",
+            "diet": "any", "updated_at": updated_at}
+
+
+@pytest.fixture
+def chroma_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CHROMA_PERSIST_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _spy_gets(store):
+    calls = []
+    get = store.get
+
+    def spy(*args, **kwargs):
+        calls.append(kwargs)
+        return get(*args, **kwargs)
+
+    store.get = spy
+    return calls
+
+
+def test_incremental_sync_reads_only_changed_recipes(chroma_dir):
+    emb = CountingEmbeddings()
+    recipes = [_recipe(i) for i in range(1, 51)]
+    store = rag.build_vector_store(recipes, T0, embeddings=emb)
+    assert emb.embedded == 50
+    assert os.path.isfile(chroma_dir / f"sync_state-{collection_name()}.json")
+
+    gets = _spy_gets(store)
+    recipes[4] = _recipe(5, "Vegan curry", T0 + timedelta(minutes=5))
+    stats = rag.sync_vector_store(
+        store, recipes[:-1], T0 + timedelta(minutes=5), changed_ids={5}, removed_ids={50},
+    )
+    assert stats == {"checked": 1, "embedded": 1, "deleted_chunks": 2, "recipes": 49}
+    assert emb.embedded == 51
+    assert all("where" in call for call in gets), gets
+    assert store.get(where={"id": 50})["ids"] == []
+    assert store.get(where={"id": 5}, include=["documents"])["documents"] == ["Vegan curry. Cook it."]
+
+
+def test_restart_checks_only_recipes_past_the_watermark(chroma_dir):
+    emb = CountingEmbeddings()
+    recipes = [_recipe(i) for i in range(1, 21)]
+    rag.build_vector_store(recipes, T0, embeddings=emb)
+
+    later = T0 + timedelta(hours=1)
+    recipes = [r for r in recipes if r["id"] != 20]
+    recipes[0] = _recipe(1, "Edited while down", later)
+    emb = CountingEmbeddings()
+    store = rag.build_vector_store(recipes, later, embeddings=emb)
+
+    assert emb.embedded == 1
+    assert store.get(where={"id": 20})["ids"] == []
+    assert len(store.get(include=[])["ids"]) == 19
+
+
+def test_state_file_is_per_collection(chroma_dir, monkeypatch):
+    rag.build_vector_store([_recipe(1)], T0, embeddings=CountingEmbeddings())
+    monkeypatch.setattr(settings, "RAG_EMBEDDING_PROVIDER", "local")
+    # No state for the local collection yet: everything is compared and embedded
+    emb = CountingEmbeddings()
+    rag.build_vector_store([_recipe(1)], T0, embeddings=emb)
+    assert emb.embedded == 1
+    assert {"sync_state-langchain.json", "sync_state-recipes_local.json"} <= set(os.listdir(chroma_dir))
+
+
+@pytest.mark.postgres
+def test_catalog_listeners_run_outside_the_lock_with_changed_ids(pg_engine):
+    from app.services.recipe_catalog import RecipeCatalog
+
+    seen = []
+
+    def listener(snapshot):
+        seen.append((RecipeCatalog._lock.locked(), snapshot.changed_ids, snapshot.removed_ids))
+
+    RecipeCatalog._snapshot = None
+    RecipeCatalog._listeners = [listener]
+    try:
+        first = RecipeCatalog.load()
+        rid = first.recipes[0]["id"]
+        with pg_engine.begin() as conn:
+            conn.execute(text("UPDATE recipes SET title = title || ' (v2)' WHERE id = :id"), {"id": rid})
+        assert RecipeCatalog.refresh()
+    finally:
+        RecipeCatalog._listeners = []
+        RecipeCatalog._snapshot = None
+
+    assert seen[0] == (False, frozenset(first.by_id), frozenset())
+    assert seen[1] == (False, frozenset({rid}), frozenset())
@@ -30,6 +30,8 @@ CREATE TABLE IF NOT EXISTS pantry_items (
   temporary BOOLEAN DEFAULT FALSE
 );
 
+CREATE UNIQUE INDEX IF NOT EXISTS uq_pantry_items_user_id_lower_name ON pantry_items (user_id, lower(name));
+
 -- ─── INGREDIENTS ──────────────────────────────────────────────────────────────
 CREATE TABLE IF NOT EXISTS ingredients (
   id SERIAL PRIMARY KEY,
@@ -37,6 +39,8 @@ CREATE TABLE IF NOT EXISTS ingredients (
   category VARCHAR(50)
 );
 
+CREATE INDEX IF NOT EXISTS ix_ingredients_normalized_name ON ingredients (lower(btrim(name, E' \t\n\r\f\v')));
+
 -- ─── RECIPES ──────────────────────────────────────────────────────────────────
 CREATE TABLE IF NOT EXISTS recipes (
   id SERIAL PRIMARY KEY,
@@ -45,9 +49,14 @@ CREATE TABLE IF NOT EXISTS recipes (
   prep_time INTEGER DEFAULT 30,
   servings INTEGER DEFAULT 4,
   cooking_method VARCHAR(50) DEFAULT 'any',
-  diet VARCHAR(50) DEFAULT 'any'
+  diet VARCHAR(50) DEFAULT 'any',
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
+CREATE INDEX IF NOT EXISTS ix_recipes_updated_at ON recipes (updated_at);
+CREATE INDEX IF NOT EXISTS ix_recipes_diet_cooking_method_prep_time ON recipes (diet, cooking_method, prep_time);
+CREATE INDEX IF NOT EXISTS ix_recipes_prep_time ON recipes (prep_time);
+
 -- ─── RECIPE ↔ INGREDIENTS ──────────────────────────────────────────────────────
 CREATE TABLE IF NOT EXISTS recipe_ingredients (
   recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
@@ -57,6 +66,38 @@ CREATE TABLE IF NOT EXISTS recipe_ingredients (
   PRIMARY KEY (recipe_id, ingredient_id)
 );
 
+CREATE INDEX IF NOT EXISTS ix_recipe_ingredients_ingredient_id ON recipe_ingredients (ingredient_id);
+
+-- ─── RECIPE CHANGE WATERMARK ───────────────────────────────────────────────────
+-- recipes.updated_at moves on every edit of a recipe or its ingredient links,
+-- so the in-memory catalogs can refresh incrementally.
+CREATE OR REPLACE FUNCTION touch_recipe_updated_at() RETURNS trigger AS $$
+BEGIN
+  NEW.updated_at := now();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION touch_parent_recipe() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    UPDATE recipes SET updated_at = now() WHERE id = OLD.recipe_id;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    UPDATE recipes SET updated_at = now() WHERE id = NEW.recipe_id;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_recipes_touch ON recipes;
+CREATE TRIGGER trg_recipes_touch BEFORE UPDATE ON recipes
+  FOR EACH ROW EXECUTE FUNCTION touch_recipe_updated_at();
+
+DROP TRIGGER IF EXISTS trg_recipe_ingredients_touch ON recipe_ingredients;
+CREATE TRIGGER trg_recipe_ingredients_touch AFTER INSERT OR UPDATE OR DELETE ON recipe_ingredients
+  FOR EACH ROW EXECUTE FUNCTION touch_parent_recipe();
+
 
 -- ─── SEED DATA ─────────────────────────────────────────────────────────────────
 
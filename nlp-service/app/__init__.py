@@ -1,4 +1,2 @@
-# expose FastAPI app
-from .main import app
-
-__all__ = ("app",)
+# The service runs as app.main:app (uvicorn/gunicorn). Nothing is imported
+# here, so app.services.* can be used without building the whole service.
@@ -0,0 +1,3 @@
+class VectorStoreInitializationError(Exception):
+    """Custom exception for vector store initialization failures."""
+    pass
@@ -1,4 +1,9 @@
-from pydantic import BaseSettings
+from typing import Literal
+
+try:
+    from pydantic_settings import BaseSettings
+except ImportError:  # pydantic 1
+    from pydantic import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
@@ -6,9 +11,24 @@ class Settings(BaseSettings):
     NLP_SBERT_MODEL: str = "all-MiniLM-L6-v2"
     MISTRAL_MODEL: str = "open-mistral-7b"
     CHROMA_PERSIST_DIR: str = "./chroma_db"
+    # RAG settings below match the backend's, which runs the same chain locally
+    VECTOR_SYNC_BATCH_SIZE: int = 64
+    RAG_EMBEDDING_PROVIDER: Literal["mistral", "local"] = "mistral"
+    MISTRAL_EMBED_ENDPOINT: str = "https://api.mistral.ai/v1/"
+    EMBEDDING_CACHE_DIR: str = "./embedding_cache"
+    RAG_ANSWER_CACHE_SIZE: int = 512
+    RAG_ANSWER_CACHE_TTL_SECONDS: float = 3600.0
+    RAG_ANSWER_CACHE_THRESHOLD: float = 0.92
+    RAG_REFORMULATION_CACHE_SIZE: int = 1024
+    RAG_REFORMULATION_CACHE_TTL_SECONDS: float = 1800.0
+    RAG_REFORMULATION_HISTORY_TURNS: int = 3
+    RECIPE_EMBEDDINGS_PATH: str = "./recipe_embeddings"
+    RECIPE_CATALOG_REFRESH_SECONDS: float = 30.0
 
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
+        # One .env serves both services (docker-compose.yml)
+        extra = "ignore"
 
 settings = Settings()
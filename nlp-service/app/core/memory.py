@@ -0,0 +1,36 @@
+import os
+from typing import Dict
+
+SMAPS_ROLLUP = "/proc/self/smaps_rollup"
+
+
+def process_memory() -> Dict[str, int]:
+    """
+    Memory of the current process in bytes, from /proc/self/smaps_rollup
+    (Linux only; empty elsewhere). `uss` is what this process alone holds,
+    `pss` charges shared pages proportionally, so summing `pss` over the
+    gunicorn workers gives their real footprint.
+    """
+    try:
+        with open(SMAPS_ROLLUP) as fh:
+            fields = {}
+            for line in fh:
+                key, _, value = line.partition(":")
+                parts = value.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[key] = int(parts[0]) * 1024
+    except OSError:
+        return {}
+    return {
+        "pid": os.getpid(),
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+
+def format_memory(mem: Dict[str, int]) -> str:
+    if not mem:
+        return "memory stats unavailable"
+    return ", ".join(f"{k} {v / 2**20:.0f} MiB" for k, v in mem.items() if k != "pid")
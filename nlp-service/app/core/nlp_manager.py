@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Optional
+
+import psycopg2
+import spacy
+from psycopg2.extras import RealDictCursor
+from sentence_transformers import SentenceTransformer
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.memory import format_memory, process_memory
+from app.core.semantic_cache import SemanticCache
+from app.services.catalog import RecipeCatalog
+from app.services.embeddings import RecipeEmbeddingIndex, encode_texts
+
+logger = logging.getLogger("chef_ai-nlp-service.nlp_manager")
+
+class NLPManager:
+    _lock = threading.Lock()
+    _nlp: Optional[spacy.Language] = None
+    _sbert: Optional[SentenceTransformer] = None
+    _recipe_index: Optional[RecipeEmbeddingIndex] = None
+    _vector_store = None
+    _rag_chain = None
+    _rag_initialized = False
+    _preloaded = False
+    _answer_cache = SemanticCache(
+        settings.RAG_ANSWER_CACHE_SIZE,
+        settings.RAG_ANSWER_CACHE_TTL_SECONDS,
+        settings.RAG_ANSWER_CACHE_THRESHOLD,
+    )
+    _reformulation_cache = TTLCache(
+        settings.RAG_REFORMULATION_CACHE_SIZE,
+        settings.RAG_REFORMULATION_CACHE_TTL_SECONDS,
+    )
+
+    @classmethod
+    def init(cls, db_conn):
+        with cls._lock:
+            if cls._rag_initialized:
+                return
+            if cls._nlp is None:
+                cls._load_models(db_conn)
+            cls._init_rag(RecipeCatalog.get(db_conn))
+            cls._rag_initialized = True
+            logger.info(
+                f"NLP ready in worker {os.getpid()} "
+                f"({'preloaded' if cls._preloaded else 'loaded here'}): {format_memory(process_memory())}"
+            )
+
+    @classmethod
+    def preload(cls):
+        """
+        Loads spaCy, SBERT and the recipe embedding matrix in the gunicorn
+        master (see gunicorn.conf.py) so forked workers share their pages
+        copy-on-write. The RAG chain holds HTTP clients and a Chroma
+        connection, which must not cross a fork, so each worker still
+        builds it on first use. The master never syncs again, so it hands
+        the embedding index's writer role to the first worker that syncs.
+        """
+        conn = psycopg2.connect(settings.DATABASE_URL, cursor_factory=RealDictCursor)
+        try:
+            with cls._lock:
+                cls._load_models(conn)
+        finally:
+            conn.close()
+        cls._recipe_index.release()
+        cls._preloaded = True
+
+    @classmethod
+    def _load_models(cls, db_conn):
+        cls._nlp = spacy.load(settings.NLP_SPACY_MODEL)
+        cls._sbert = SentenceTransformer(settings.NLP_SBERT_MODEL)
+
+        recipes = RecipeCatalog.get(db_conn)
+        index = RecipeEmbeddingIndex(settings.RECIPE_EMBEDDINGS_PATH, settings.NLP_SBERT_MODEL)
+        index.load()
+        index.sync(recipes, cls._sbert)
+        cls._recipe_index = index
+        RecipeCatalog.subscribe(cls._on_catalog_update)
+
+    @classmethod
+    def _init_rag(cls, recipes):
+        """Same store, sync and chain as the backend's INFERENCE_MODE=local warm-up."""
+        try:
+            from langchain_mistralai import ChatMistralAI
+            from app.services.rag import build_vector_store, create_rag_chain
+            from app.services.rag_embeddings import get_rag_embeddings
+
+            store = build_vector_store(
+                recipes, RecipeCatalog.watermark(),
+                embeddings=get_rag_embeddings(cls._sbert, settings.NLP_SBERT_MODEL),
+            )
+            cls._rag_chain = create_rag_chain(
+                ChatMistralAI(model=settings.MISTRAL_MODEL), store,
+                answer_cache=cls._answer_cache, embed_query=cls._embed_query,
+                reformulation_cache=cls._reformulation_cache,
+                history_turns=settings.RAG_REFORMULATION_HISTORY_TURNS,
+            )
+            cls._vector_store = store
+        except Exception as e:
+            logger.error(f"RAG initialization failed, rule mode only: {e}", exc_info=True)
+
+    @classmethod
+    def _on_catalog_update(cls, recipes):
+        if cls._recipe_index is not None and cls._sbert is not None:
+            cls._recipe_index.sync(recipes, cls._sbert)
+        if cls._vector_store is not None:
+            from app.services.rag import catch_up_vector_store
+
+            catch_up_vector_store(cls._vector_store, recipes, RecipeCatalog.watermark())
+        # Cached answers quote recipe contents that may just have changed
+        cls._answer_cache.clear()
+
+    @classmethod
+    async def _embed_query(cls, query: str):
+        return (await asyncio.to_thread(encode_texts, cls._sbert, [query]))[0]
+
+    @classmethod
+    def get_nlp(cls):
+        return cls._nlp
+
+    @classmethod
+    def get_sbert(cls):
+        return cls._sbert
+
+    @classmethod
+    def get_recipe_index(cls) -> Optional[RecipeEmbeddingIndex]:
+        return cls._recipe_index
+
+    @classmethod
+    def get_rag_chain(cls):
+        return cls._rag_chain
+
+    @classmethod
+    def answer_cache_stats(cls):
+        return cls._answer_cache.stats()
+
+    @classmethod
+    def reformulation_cache_stats(cls):
+        return cls._reformulation_cache.stats()
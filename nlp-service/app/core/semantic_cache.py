@@ -0,0 +1,85 @@
+# Kept in sync by hand with backend/app/core/semantic_cache.py.
+# backend/tests/test_shared_modules.py fails if they drift.
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Thread-safe LRU cache looked up by similarity rather than equality.
+    Entries are stored under a query embedding (normalised, so cosine
+    similarity is a dot product) and an exact `scope` — the set of
+    retrieved document ids for RAG answers. A lookup returns the value of
+    the most similar live entry in the same scope, provided its similarity
+    reaches `threshold`. Entries expire `ttl` seconds after being set.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, threshold: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._seq = 0
+        # seq -> (expires, scope, embedding, value), in LRU order
+        self._data: "OrderedDict[int, tuple]" = OrderedDict()
+        # scope -> seqs stored under it, so a lookup only compares within its scope
+        self._scopes: Dict[FrozenSet[Hashable], set] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, embedding: np.ndarray, scope: FrozenSet[Hashable], default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            best, best_sim = None, self.threshold
+            for seq in list(self._scopes.get(scope, ())):
+                expires, _, emb, _ = self._data[seq]
+                if expires <= now:
+                    self._remove(seq)
+                    continue
+                sim = float(np.dot(emb, embedding))
+                if sim >= best_sim:
+                    best, best_sim = seq, sim
+            if best is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(best)
+            self.hits += 1
+            return self._data[best][3]
+
+    def set(self, embedding: np.ndarray, scope: FrozenSet[Hashable], value: Any) -> None:
+        with self._lock:
+            self._seq += 1
+            self._data[self._seq] = (time.monotonic() + self.ttl, scope, embedding, value)
+            self._scopes.setdefault(scope, set()).add(self._seq)
+            while len(self._data) > self.maxsize:
+                self._remove(next(iter(self._data)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._scopes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def _remove(self, seq: int) -> None:
+        _, scope, _, _ = self._data.pop(seq)
+        seqs = self._scopes[scope]
+        seqs.discard(seq)
+        if not seqs:
+            del self._scopes[scope]
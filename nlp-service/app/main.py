@@ -18,7 +18,7 @@ app.add_middleware(
 )
 
 # Routers
-app.include_router(process.router, prefix="/process")
+app.include_router(process.router)
 app.include_router(health.router)
 
 @app.on_event("startup")
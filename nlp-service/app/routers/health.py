@@ -1,8 +1,25 @@
 from fastapi import APIRouter
 from datetime import datetime
 
+from app.core.memory import process_memory
+
 router = APIRouter(tags=["Health"])
 
 @router.get("/ping")
 async def ping():
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+
+@router.get("/metrics/memory")
+async def memory():
+    """USS/PSS of the worker that answers; models preloaded by gunicorn show up as shared."""
+    return process_memory()
+
+@router.get("/metrics/caches")
+async def caches():
+    """RAG cache stats of the worker that answers."""
+    from app.core.nlp_manager import NLPManager
+
+    return {
+        "rag_answers": NLPManager.answer_cache_stats(),
+        "rag_reformulations": NLPManager.reformulation_cache_stats(),
+    }
@@ -1,18 +1,32 @@
+import json
+import logging
 import uuid
 from datetime import datetime
+from typing import Any, AsyncIterator
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from psycopg2.extensions import connection
 
-from app.schemas.process import ProcessRequest, ProcessResponse
+from app.schemas.process import (
+    ProcessRequest, ProcessResponse,
+    IntentsRequest, IntentsResponse, IntentResult,
+    RankRequest, RankResponse,
+    RagRequest, RagResponse,
+)
 from app.dependencies import get_db_connection, get_nlp_manager
-from app.services.db import get_recipes, get_user_profile
+from app.services.catalog import RecipeCatalog
+from app.services.db import get_user_profile
+from app.services.llm_calls import LLMCallCounter
 from app.services.nlp import (
     extract_intent_and_entities,
+    extract_intents_and_entities,
     filter_recipes,
     rank_recipes,
     personalize_response,
 )
 
+logger = logging.getLogger("chef_ai-nlp-service.process")
+
 router = APIRouter(prefix="/process", tags=["Process"])
 
 @router.post("/", response_model=ProcessResponse)
@@ -24,7 +38,7 @@ async def process_query(
     session_id = req.session_id or str(uuid.uuid4())
     ts = datetime.utcnow().isoformat()
 
-    recipes = get_recipes(db_conn)
+    recipes = RecipeCatalog.get(db_conn)
     profile = get_user_profile(db_conn, req.user_id)
 
     # RAG
@@ -32,8 +46,10 @@ async def process_query(
         chain = nlp_mgr.get_rag_chain()
         if not chain:
             raise HTTPException(503, "RAG unavailable")
+        llm_calls = LLMCallCounter()
         try:
-            out = await chain.ainvoke({"input": req.query, "chat_history": []})
+            out = await chain.ainvoke({"input": req.query}, config={"callbacks": [llm_calls]})
+            logger.info(f"RAG request made {llm_calls.calls} LLM call(s)")
             return ProcessResponse(message=out.get("answer",""), session_id=session_id, timestamp=ts)
         except Exception:
             raise HTTPException(500, "RAG processing failed")
@@ -49,3 +65,75 @@ async def process_query(
     return ProcessResponse(
         message=msg, recommendations=recs, session_id=session_id, timestamp=ts
     )
+
+
+# — Remote inference endpoints, called by the backend when INFERENCE_MODE=remote —
+
+def _rag_input(req: RagRequest) -> dict:
+    return {"input": req.query, "chat_history": req.chat_history, "session_id": req.session_id}
+
+def _recipe_ids(docs) -> list:
+    return list(dict.fromkeys(
+        doc.metadata.get("id") for doc in docs if doc.metadata.get("id") is not None
+    ))
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/intents", response_model=IntentsResponse)
+def intents(req: IntentsRequest, nlp_mgr=Depends(get_nlp_manager)):
+    """Intent and entities for a batch of queries, in one spaCy pipe pass."""
+    return IntentsResponse(results=[
+        IntentResult(intent=intent, entities=entities)
+        for intent, entities in extract_intents_and_entities(req.queries)
+    ])
+
+@router.post("/rank", response_model=RankResponse)
+def rank(
+    req: RankRequest,
+    db_conn: connection = Depends(get_db_connection),
+    nlp_mgr=Depends(get_nlp_manager),
+):
+    """Orders the given recipe ids by SBERT similarity to the query."""
+    recipes = RecipeCatalog.get_many(db_conn, req.recipe_ids)
+    return RankResponse(recipe_ids=[r["id"] for r in rank_recipes(req.query, recipes)])
+
+@router.post("/rag", response_model=RagResponse)
+async def rag(req: RagRequest, nlp_mgr=Depends(get_nlp_manager)):
+    chain = nlp_mgr.get_rag_chain()
+    if not chain:
+        raise HTTPException(503, "RAG unavailable")
+    llm_calls = LLMCallCounter()
+    try:
+        out = await chain.ainvoke(_rag_input(req), config={"callbacks": [llm_calls]})
+    except Exception:
+        logger.exception("Error running RAG chain")
+        raise HTTPException(500, "RAG processing failed")
+    return RagResponse(
+        answer=out.get("answer", ""),
+        recipe_ids=_recipe_ids(out.get("context", [])),
+        llm_calls=llm_calls.calls,
+    )
+
+@router.post("/rag/stream")
+async def rag_stream(req: RagRequest, nlp_mgr=Depends(get_nlp_manager)):
+    """Same events as the backend's /chat/rag/stream: recipes, token, done or error."""
+    chain = nlp_mgr.get_rag_chain()
+    if not chain:
+        raise HTTPException(503, "RAG unavailable")
+    llm_calls = LLMCallCounter()
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for chunk in chain.astream(_rag_input(req), config={"callbacks": [llm_calls]}):
+                if "context" in chunk:
+                    yield _sse("recipes", {"recipe_ids": _recipe_ids(chunk["context"])})
+                if chunk.get("answer"):
+                    yield _sse("token", {"token": chunk["answer"]})
+        except Exception:
+            logger.exception("Error streaming RAG chain")
+            yield _sse("error", {"detail": "RAG processing failed"})
+            return
+        yield _sse("done", {"llm_calls": llm_calls.calls})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -12,3 +12,32 @@ class ProcessResponse(BaseModel):
     recommendations: Optional[List[Dict[str, Any]]] = None
     session_id: Optional[str] = None
     timestamp: Optional[str] = None
+
+# — Remote inference for the backend (INFERENCE_MODE=remote) —
+
+class IntentsRequest(BaseModel):
+    queries: List[str]
+
+class IntentResult(BaseModel):
+    intent: str
+    entities: Dict[str, List[str]]
+
+class IntentsResponse(BaseModel):
+    results: List[IntentResult]
+
+class RankRequest(BaseModel):
+    query: str
+    recipe_ids: List[int]
+
+class RankResponse(BaseModel):
+    recipe_ids: List[int]
+
+class RagRequest(BaseModel):
+    query: str
+    chat_history: List[Dict[str, str]] = []
+    session_id: Optional[str] = None
+
+class RagResponse(BaseModel):
+    answer: str
+    recipe_ids: List[int] = []
+    llm_calls: int = 0
@@ -0,0 +1,99 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from psycopg2.extensions import connection
+
+from app.core.config import settings
+from app.services.db import get_recipe_ids, get_recipe_watermark, get_recipes
+
+logger = logging.getLogger("chef_ai-nlp-service.catalog")
+
+# Re-read recipes touched just below the watermark by late-committing transactions.
+WATERMARK_LAG = timedelta(seconds=60)
+
+def _freeze(recipe: Mapping[str, Any]) -> Mapping[str, Any]:
+    return MappingProxyType(dict(recipe, ingredients=tuple(recipe["ingredients"])))
+
+class RecipeCatalog:
+    """
+    Process-wide, read-only recipe snapshot. Loaded on first use and refreshed
+    incrementally by recipes.updated_at at most every RECIPE_CATALOG_REFRESH_SECONDS.
+    """
+    _lock = threading.Lock()
+    _by_id: Dict[int, Mapping[str, Any]] = {}
+    _recipes: Tuple[Mapping[str, Any], ...] = ()
+    _watermark: Optional[datetime] = None
+    _loaded = False
+    _checked_at = 0.0
+    _listeners: List[Callable[[Tuple[Mapping[str, Any], ...]], None]] = []
+
+    @classmethod
+    def get(cls, conn: connection) -> Tuple[Mapping[str, Any], ...]:
+        if not cls._loaded or time.monotonic() - cls._checked_at >= settings.RECIPE_CATALOG_REFRESH_SECONDS:
+            with cls._lock:
+                if not cls._loaded:
+                    cls._load(conn)
+                elif time.monotonic() - cls._checked_at >= settings.RECIPE_CATALOG_REFRESH_SECONDS:
+                    cls._refresh(conn)
+        return cls._recipes
+
+    @classmethod
+    def get_many(cls, conn: connection, ids: List[int]) -> List[Mapping[str, Any]]:
+        """Recipes for `ids`, in that order; unknown ids are skipped."""
+        cls.get(conn)
+        by_id = cls._by_id
+        return [by_id[rid] for rid in ids if rid in by_id]
+
+    @classmethod
+    def watermark(cls) -> Optional[datetime]:
+        """Latest recipes.updated_at in the current snapshot."""
+        return cls._watermark
+
+    @classmethod
+    def subscribe(cls, listener: Callable[[Tuple[Mapping[str, Any], ...]], None]) -> None:
+        if listener not in cls._listeners:
+            cls._listeners.append(listener)
+
+    @classmethod
+    def _load(cls, conn: connection):
+        recipes = get_recipes(conn)
+        cls._by_id = {r["id"]: _freeze(r) for r in recipes}
+        cls._watermark = max((r["updated_at"] for r in recipes), default=None)
+        cls._loaded = True
+        cls._publish()
+
+    @classmethod
+    def _refresh(cls, conn: connection):
+        cls._checked_at = time.monotonic()
+        total, latest = get_recipe_watermark(conn)
+        dirty = False
+        if latest is not None and (cls._watermark is None or latest > cls._watermark - WATERMARK_LAG):
+            since = cls._watermark - WATERMARK_LAG if cls._watermark else None
+            for r in get_recipes(conn, updated_since=since):
+                fresh = _freeze(r)
+                if cls._by_id.get(r["id"]) != fresh:
+                    cls._by_id[r["id"]] = fresh
+                    dirty = True
+            cls._watermark = max(cls._watermark or latest, latest)
+        if len(cls._by_id) != total:
+            live = get_recipe_ids(conn)
+            for rid in [rid for rid in cls._by_id if rid not in live]:
+                del cls._by_id[rid]
+                dirty = True
+        if dirty:
+            cls._publish()
+
+    @classmethod
+    def _publish(cls):
+        cls._checked_at = time.monotonic()
+        cls._recipes = tuple(cls._by_id[rid] for rid in sorted(cls._by_id))
+        logger.info(f"Recipe catalog: {len(cls._recipes)} recipes, watermark {cls._watermark}")
+        for listener in cls._listeners:
+            try:
+                listener(cls._recipes)
+            except Exception as e:
+                logger.error(f"Recipe catalog listener failed: {e}", exc_info=True)
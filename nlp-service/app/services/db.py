@@ -1,19 +1,35 @@
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Set, Tuple
 import psycopg2
 from psycopg2.extensions import connection
 
-def get_recipes(conn: connection) -> List[Dict[str, Any]]:
+def get_recipes(conn: connection, updated_since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    # LEFT JOINs: recipes without ingredients are still part of the catalog
+    # (as in the backend's), so /rank never drops ids it was given
     with conn.cursor() as cur:
         cur.execute("""
             SELECT r.id, r.title, r.prep_time, r.servings, r.cooking_method,
-                   r.instructions, r.diet, array_agg(i.name) AS ingredients
+                   r.instructions, r.diet, r.updated_at,
+                   coalesce(array_agg(i.name) FILTER (WHERE i.id IS NOT NULL), '{}') AS ingredients
               FROM recipes r
-              JOIN recipe_ingredients ri ON r.id = ri.recipe_id
-              JOIN ingredients i ON ri.ingredient_id = i.id
+         LEFT JOIN recipe_ingredients ri ON r.id = ri.recipe_id
+         LEFT JOIN ingredients i ON ri.ingredient_id = i.id
+             WHERE %(since)s::timestamptz IS NULL OR r.updated_at >= %(since)s
           GROUP BY r.id
-        """)
+        """, {"since": updated_since})
         return cur.fetchall()
 
+def get_recipe_watermark(conn: connection) -> Tuple[int, Optional[datetime]]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT count(*) AS total, max(updated_at) AS latest FROM recipes")
+        row = cur.fetchone()
+        return row["total"], row["latest"]
+
+def get_recipe_ids(conn: connection) -> Set[int]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT id FROM recipes")
+        return {r["id"] for r in cur.fetchall()}
+
 def get_user_profile(conn: connection, user_id: str) -> Dict[str, Any]:
     # preferences
     with conn.cursor() as cur:
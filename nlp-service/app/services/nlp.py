@@ -1,23 +1,30 @@
 from typing import List, Dict, Any, Tuple
-import spacy
-from sentence_transformers import util
+import numpy as np
 
 from app.core.nlp_manager import NLPManager
+from app.services.embeddings import encode_texts, recipe_text
 
-def extract_intent_and_entities(query: str) -> Tuple[str, Dict[str, List[str]]]:
-    nlp = NLPManager.get_nlp()
+def _intent_from_doc(query: str, doc) -> Tuple[str, Dict[str, List[str]]]:
     intent = "unknown"
-    entities, keywords = [], []
-    if nlp:
-        doc = nlp(query.lower())
-        if any(tok.lemma_ in {"cook", "make", "prepare", "recipe"} for tok in doc):
-            intent = "suggest_dish"
-        elif "pantry" in query.lower():
-            intent = "manage_pantry"
-        entities = [e.text for e in doc.ents]
-        keywords = [tok.text for tok in doc if tok.pos_ in {"NOUN", "ADJ"}]
+    if any(tok.lemma_ in {"cook", "make", "prepare", "recipe"} for tok in doc):
+        intent = "suggest_dish"
+    elif "pantry" in query.lower():
+        intent = "manage_pantry"
+    entities = [e.text for e in doc.ents]
+    keywords = [tok.text for tok in doc if tok.pos_ in {"NOUN", "ADJ"}]
     return intent, {"entities": entities, "keywords": keywords}
 
+def extract_intent_and_entities(query: str) -> Tuple[str, Dict[str, List[str]]]:
+    return extract_intents_and_entities([query])[0]
+
+def extract_intents_and_entities(queries: List[str]) -> List[Tuple[str, Dict[str, List[str]]]]:
+    """Batch variant: one nlp.pipe pass over all queries."""
+    nlp = NLPManager.get_nlp()
+    if not nlp:
+        return [("unknown", {"entities": [], "keywords": []}) for _ in queries]
+    docs = nlp.pipe(q.lower() for q in queries)
+    return [_intent_from_doc(q, doc) for q, doc in zip(queries, docs)]
+
 def filter_recipes(
     recipes: List[Dict[str, Any]],
     pantry: List[str],
@@ -25,9 +32,10 @@ def filter_recipes(
 ) -> List[Dict[str, Any]]:
     out = []
     threshold = prefs.get("match_threshold", 0.5)
+    pantry_set = set(pantry)
     for r in recipes:
         ingr = set(r["ingredients"])
-        if len(ingr & set(pantry)) / max(len(ingr), 1) < threshold:
+        if len(ingr & pantry_set) / max(len(ingr), 1) < threshold:
             continue
         if (dp := prefs.get("dietary_preference", "any")) != "any" and r.get("diet") != dp:
             continue
@@ -44,15 +52,14 @@ def rank_recipes(query: str, recipes: List[Dict[str, Any]]) -> List[Dict[str, An
     sbert = NLPManager.get_sbert()
     if not sbert or not recipes:
         return recipes
-    qemb = sbert.encode(query, convert_to_tensor=True)
-    scored = []
-    for r in recipes:
-        text = f"{r['title']}. {r['instructions']}"
-        remb = sbert.encode(text, convert_to_tensor=True)
-        score = util.cos_sim(qemb, remb).item()
-        scored.append((score, r))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [r for _, r in scored]
+    qemb = encode_texts(sbert, [query])[0]
+    index = NLPManager.get_recipe_index()
+    if index is not None:
+        scores = index.score(qemb, recipes, sbert)
+    else:
+        scores = encode_texts(sbert, [recipe_text(r) for r in recipes]) @ qemb
+    order = np.argsort(-scores, kind="stable")
+    return [recipes[i] for i in order]
 
 def personalize_response(query: str, recipes: List[Dict[str, Any]]) -> str:
     if not recipes:
@@ -0,0 +1,62 @@
+# Kept in sync by hand with backend/app/services/rag_embeddings.py.
+# backend/tests/test_shared_modules.py fails if they drift.
+import logging
+from typing import List
+
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+from langchain_core.embeddings import Embeddings
+from langchain_mistralai import MistralAIEmbeddings
+
+from app.core.config import settings
+from app.services.embeddings import encode_texts
+
+logger = logging.getLogger("chef_ai-nlp-service.rag_embeddings")
+
+MISTRAL_EMBED_MODEL = "mistral-embed"
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """LangChain adapter over an already-loaded SentenceTransformer; batched, offline."""
+
+    def __init__(self, model, model_name: str, batch_size: int = 64):
+        self.model = model
+        self.model_name = model_name
+        self.batch_size = batch_size
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return encode_texts(self.model, texts, self.batch_size).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return encode_texts(self.model, [text])[0].tolist()
+
+
+def collection_name() -> str:
+    """Chroma collection for the configured provider; embedding sizes differ."""
+    if settings.RAG_EMBEDDING_PROVIDER == "local":
+        return "recipes_local"
+    return "langchain"  # Chroma's default, used by stores built before providers existed
+
+
+def get_rag_embeddings(sbert=None, sbert_name: str = "") -> Embeddings:
+    """
+    Embedding function for the RAG vector store. Document embeddings are
+    cached on disk under EMBEDDING_CACHE_DIR, keyed by a hash of the text
+    (LocalFileStore rejects ":" in keys, hence the dotted namespace).
+    """
+    provider = settings.RAG_EMBEDDING_PROVIDER
+    if provider == "local":
+        if sbert is None:
+            raise ValueError("RAG_EMBEDDING_PROVIDER=local needs a loaded SentenceTransformer")
+        base: Embeddings = SentenceTransformerEmbeddings(sbert, sbert_name)
+        namespace = f"local.{sbert_name}"
+    else:
+        base = MistralAIEmbeddings(model=MISTRAL_EMBED_MODEL, endpoint=settings.MISTRAL_EMBED_ENDPOINT)
+        namespace = f"mistral.{MISTRAL_EMBED_MODEL}"
+    logger.info(f"RAG embeddings: {namespace}")
+
+    if not settings.EMBEDDING_CACHE_DIR:
+        return base
+    return CacheBackedEmbeddings.from_bytes_store(
+        base, LocalFileStore(settings.EMBEDDING_CACHE_DIR), namespace=namespace
+    )
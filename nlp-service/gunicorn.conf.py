@@ -0,0 +1,31 @@
+# Pre-fork deployment of the NLP service:
+#   gunicorn -c gunicorn.conf.py app.main:app
+# spaCy, SBERT and the recipe embedding matrix are loaded once in the master
+# and shared copy-on-write by the workers; compare per-worker `uss` at
+# GET /metrics/memory against a plain multi-worker uvicorn run.
+import gc
+import os
+
+from app.core.memory import format_memory, process_memory
+
+bind = os.getenv("BIND", "0.0.0.0:8001")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 120
+
+
+def on_starting(server):
+    from app.core.nlp_manager import NLPManager
+
+    NLPManager.preload()
+    # Move everything loaded so far into the permanent generation: the
+    # workers' collector then never writes to those objects' GC headers,
+    # which would otherwise un-share their pages one by one.
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"Models preloaded in master {os.getpid()}: {format_memory(process_memory())}")
+
+
+def post_worker_init(worker):
+    worker.log.info(f"Worker {worker.pid} forked: {format_memory(process_memory())}")